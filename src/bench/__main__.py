@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from bench.corpus import DEFAULT_SHAPE, CorpusGenerator
+from bench.stages import STAGES, StageBench, prepare_site
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="bench", description="Benchmark the site generator stages")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="generate a corpus and time each stage")
+    for name, default in DEFAULT_SHAPE.items():
+        run.add_argument("--" + name.replace("_", "-"), type=type(default), default=default)
+    run.add_argument("--stages", default=",".join(STAGES), help="comma-separated stages to time")
+    run.add_argument("--repeat", type=int, default=3, help="keep the best of N runs per stage")
+    run.add_argument("--output", help="write the results JSON here")
+    run.add_argument("--history", help="append the results to this JSON-lines file")
+    run.add_argument("--baseline", help="results JSON to compare against (default: last history entry)")
+    run.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown ratio before failing")
+
+    compare = subparsers.add_parser("compare", help="compare two results files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.10)
+    return parser.parse_args()
+
+
+def run_benchmarks(args):
+    shape = {name: getattr(args, name) for name in DEFAULT_SHAPE}
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages: {', '.join(sorted(unknown))}")
+    with tempfile.TemporaryDirectory() as site_dir:
+        prepare_site(site_dir, CorpusGenerator(**shape))
+        stage_results = StageBench(site_dir, args.repeat).run(stages)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "shape": shape,
+        "repeat": args.repeat,
+        "stages": stage_results,
+    }
+
+
+def load_baseline(args):
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            return json.load(f)
+    if args.history and os.path.exists(args.history):
+        last = None
+        with open(args.history, "r") as f:
+            for line in f:
+                if line.strip():
+                    last = line
+        if last is not None:
+            return json.loads(last)
+    return None
+
+
+def compare_results(baseline, current, threshold):
+    regressions = []
+    if baseline.get("shape") != current.get("shape"):
+        print("warning: corpus shapes differ, comparison may not be meaningful")
+    print(f"{'stage':<22} {'baseline':>12} {'current':>12} {'change':>8}")
+    for stage, result in current["stages"].items():
+        before = baseline["stages"].get(stage)
+        if before is None:
+            print(f"{stage:<22} {'-':>12} {result['seconds']:>11.4f}s {'new':>8}")
+            continue
+        ratio = result["seconds"] / before["seconds"] - 1 if before["seconds"] else 0.0
+        flag = " REGRESSION" if ratio > threshold else ""
+        print(f"{stage:<22} {before['seconds']:>11.4f}s {result['seconds']:>11.4f}s {ratio:>+7.1%}{flag}")
+        if ratio > threshold:
+            regressions.append(stage)
+    return regressions
+
+
+def print_results(results):
+    print(f"{'stage':<22} {'seconds':>10} {'units':>8} {'us/unit':>10}")
+    for stage, result in results["stages"].items():
+        per_unit = result["per_unit_us"]
+        per_unit = f"{per_unit:>10.1f}" if per_unit is not None else f"{'-':>10}"
+        print(f"{stage:<22} {result['seconds']:>10.4f} {result['units']:>8} {per_unit}")
+
+
+def main():
+    args = parse_args()
+    if args.command == "compare":
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        with open(args.current, "r") as f:
+            current = json.load(f)
+        return 1 if compare_results(baseline, current, args.threshold) else 0
+
+    results = run_benchmarks(args)
+    print_results(results)
+    baseline = load_baseline(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.history:
+        with open(args.history, "a") as f:
+            f.write(json.dumps(results) + "\n")
+    if baseline is None:
+        return 0
+    print()
+    return 1 if compare_results(baseline, results, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+import os
+import random
+
+
+WORDS = (
+    "elf ring shire river forest stone tower king song road star ship sword hill "
+    "light shadow wind fire winter morning dwarf lore map gate horn bridge valley"
+).split()
+
+DEFAULT_SHAPE = {
+    "pages": 200,
+    "sections": 8,
+    "blocks_per_page": 20,
+    "words_per_paragraph": 60,
+    "link_density": 0.05,
+    "emphasis_density": 0.08,
+    "list_length": 6,
+    "code_block_ratio": 0.1,
+    "static_files": 20,
+    "static_file_bytes": 64 * 1024,
+    "seed": 1,
+}
+
+
+class CorpusGenerator:
+    def __init__(self, **shape):
+        unknown = set(shape) - set(DEFAULT_SHAPE)
+        if unknown:
+            raise ValueError(f"unknown corpus options: {', '.join(sorted(unknown))}")
+        self.shape = {**DEFAULT_SHAPE, **shape}
+        self.random = random.Random(self.shape["seed"])
+
+    def words(self, count):
+        return [self.random.choice(WORDS) for _ in range(count)]
+
+    def inline_text(self, count):
+        out = []
+        link_density = self.shape["link_density"]
+        emphasis_density = self.shape["emphasis_density"]
+        for word in self.words(count):
+            roll = self.random.random()
+            if roll < link_density:
+                if self.random.random() < 0.2:
+                    out.append(f"![{word}](/images/{word}.png)")
+                else:
+                    out.append(f"[{word}](/{word}/)")
+            elif roll < link_density + emphasis_density:
+                out.append(self.random.choice(("**{}**", "_{}_", "`{}`")).format(word))
+            else:
+                out.append(word)
+        return " ".join(out)
+
+    def paragraph(self):
+        text = self.inline_text(self.shape["words_per_paragraph"])
+        words = text.split(" ")
+        lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+        return "\n".join(lines)
+
+    def block(self):
+        roll = self.random.random()
+        if roll < self.shape["code_block_ratio"]:
+            lines = [" ".join(self.words(6)) for _ in range(self.random.randint(2, 8))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        roll = self.random.random()
+        if roll < 0.1:
+            return "## " + self.inline_text(5)
+        if roll < 0.2:
+            return "\n".join("> " + self.inline_text(10) for _ in range(3))
+        if roll < 0.3:
+            return "\n".join("- " + self.inline_text(8) for _ in range(self.shape["list_length"]))
+        if roll < 0.4:
+            return "\n".join(
+                f"{i}. " + self.inline_text(8) for i in range(1, self.shape["list_length"] + 1)
+            )
+        return self.paragraph()
+
+    def page(self, number):
+        title = " ".join(self.words(3)).title()
+        blocks = [f"# {title} {number}"]
+        blocks.extend(self.block() for _ in range(self.shape["blocks_per_page"]))
+        return "\n\n".join(blocks) + "\n"
+
+    def pages(self):
+        for number in range(self.shape["pages"]):
+            section = f"section-{number % self.shape['sections']}"
+            yield os.path.join(section, f"page-{number}", "index.md"), self.page(number)
+
+    def write(self, root):
+        content_dir = os.path.join(root, "content")
+        static_dir = os.path.join(root, "static")
+        for relative, markdown in self.pages():
+            path = os.path.join(content_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(markdown)
+        os.makedirs(os.path.join(static_dir, "images"), exist_ok=True)
+        for number in range(self.shape["static_files"]):
+            path = os.path.join(static_dir, "images", f"asset-{number}.bin")
+            with open(path, "wb") as f:
+                f.write(self.random.randbytes(self.shape["static_file_bytes"]))
+        return content_dir, static_dir
@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+
+from bench import ROOT_DIR, best_of
+from bench.nodes import load_pages
+from htmlnode import LeafNode, ParentNode, escape_attribute, escape_text
+from markdown_blocks import markdown_to_html_node
+
+
+def collect_values(trees):
+    texts = []
+    attributes = []
+    stack = list(trees)
+    while stack:
+        node = stack.pop()
+        if node.props is not None:
+            attributes.extend(node.props.values())
+        if isinstance(node, ParentNode):
+            stack.extend(node.children)
+        elif isinstance(node, LeafNode):
+            texts.append(node.value)
+    return texts, attributes
+
+
+def measure(pages, repeat):
+    trees = [markdown_to_html_node(page) for page in pages]
+    texts, attributes = collect_values(trees)
+    serialize = best_of(repeat, lambda: [tree.to_html() for tree in trees])
+    escape = best_of(repeat, lambda: (
+        [escape_text(text) for text in texts],
+        [escape_attribute(value) for value in attributes],
+    ))
+    escaped = sum(escape_text(text) is not text for text in texts)
+    escaped += sum(escape_attribute(value) is not value for value in attributes)
+    return {
+        "pages": len(pages),
+        "values": len(texts) + len(attributes),
+        "escaped_values": escaped,
+        "serialize_seconds": serialize,
+        "escape_seconds": escape,
+        "escape_share": escape / serialize if serialize else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of HTML escaping during serialization")
+    parser.add_argument("--content", default=os.path.join(ROOT_DIR, "content"))
+    parser.add_argument("--scale", type=int, default=200, help="repeat the content pages this many times")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = measure(load_pages(args.content, args.scale), args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(
+        f"{results['pages']} pages, {results['values']} text and attribute values, "
+        f"{results['escaped_values']} needed escaping"
+    )
+    print(f"to_html {results['serialize_seconds']:.4f}s, escape calls alone {results['escape_seconds']:.4f}s")
+    print(f"escaping share of serialization: {results['escape_share']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import argparse
+import json
+
+from bench import best_of
+from inline_parser import text_to_html_nodes
+
+
+SHAPES = {
+    "nested": ("**bold _italic_ [link **text**](/u) bold** ", 8),
+    "unmatched_openers": ("_open **open ", 2),
+    "unmatched_closers": ("close_ close** ", 2),
+    "openers_then_closers": (None, 2),
+    "brackets": ("[a _b ", 2),
+    "backticks": (None, 1),
+    "snake_case": ("snake_case_name ", 2),
+}
+
+
+def make_paragraph(shape, delimiters):
+    unit, per_unit = SHAPES[shape]
+    count = max(1, delimiters // per_unit)
+    if shape == "openers_then_closers":
+        return "_a " * count + "b** " * count
+    if shape == "backticks":
+        return " ".join("`" * (number % 50 + 1) + "x" for number in range(count))
+    return unit * count
+
+
+def measure(shapes, sizes, repeat):
+    results = {}
+    for shape in shapes:
+        rows = []
+        for delimiters in sizes:
+            text = make_paragraph(shape, delimiters)
+            seconds = best_of(repeat, lambda: text_to_html_nodes(text))
+            rows.append({
+                "delimiters": delimiters,
+                "chars": len(text),
+                "seconds": seconds,
+                "us_per_kchar": seconds / len(text) * 1e9,
+            })
+        results[shape] = rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the inline parser on paragraphs with many delimiters")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="comma-separated paragraph shapes")
+    parser.add_argument("--sizes", default="1000,4000,16000,64000", help="delimiters per paragraph")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    shapes = [shape.strip() for shape in args.shapes.split(",") if shape.strip()]
+    unknown = set(shapes) - set(SHAPES)
+    if unknown:
+        raise ValueError(f"unknown shapes: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = measure(shapes, sizes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'shape':<22} {'delimiters':>10} {'chars':>9} {'seconds':>9} {'us/kchar':>9}")
+    for shape, rows in results.items():
+        for row in rows:
+            print(
+                f"{shape:<22} {row['delimiters']:>10} {row['chars']:>9} "
+                f"{row['seconds']:>9.4f} {row['us_per_kchar']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from bench import ROOT_DIR
+from htmlnode import LeafNode, ParentNode
+from markdown_blocks import markdown_to_html_node
+from profiler import count_nodes
+from textnode import TextNode, TextType
+
+
+def load_pages(content_dir, scale):
+    pages = []
+    for root, _, filenames in os.walk(content_dir):
+        for filename in sorted(filenames):
+            if filename.endswith(".md"):
+                with open(os.path.join(root, filename), "r") as f:
+                    pages.append(f.read())
+    return pages * scale
+
+
+def bytes_per_instance(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(instances)) / len(instances)
+
+
+def measure_instances(count):
+    children = [LeafNode(None, "text")]
+    return {
+        "TextNode": bytes_per_instance(lambda: TextNode("text", TextType.BOLD), count),
+        "LeafNode": bytes_per_instance(lambda: LeafNode("b", "text"), count),
+        "ParentNode": bytes_per_instance(lambda: ParentNode("p", children), count),
+    }
+
+
+def measure_pages(pages, repeat):
+    nodes = 0
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        trees = [markdown_to_html_node(page) for page in pages]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    nodes = sum(count_nodes(tree) for tree in trees)
+    del trees
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    trees = [markdown_to_html_node(page) for page in pages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        "pages": len(pages),
+        "nodes": nodes,
+        "seconds": best,
+        "nodes_per_second": nodes / best,
+        "tree_bytes_per_node": (after - before - sys.getsizeof(trees)) / nodes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure node memory and tree-building throughput")
+    parser.add_argument("--content", default=os.path.join(ROOT_DIR, "content"))
+    parser.add_argument("--scale", type=int, default=200, help="repeat the content pages this many times")
+    parser.add_argument("--instances", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        "bytes_per_instance": measure_instances(args.instances),
+        "pages": measure_pages(load_pages(args.content, args.scale), args.repeat),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, size in results["bytes_per_instance"].items():
+        print(f"{name:<12} {size:8.1f} bytes/instance")
+    pages = results["pages"]
+    print(f"{pages['pages']} pages, {pages['nodes']} nodes in {pages['seconds']:.3f}s")
+    print(f"{pages['nodes_per_second']:,.0f} nodes/s, {pages['tree_bytes_per_node']:.1f} bytes/node in built trees")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bench import ROOT_DIR, SRC_DIR, best_of
+from copystatic import copy_files_recursive
+from gencontent import generate_page
+from htmlwriter import markdown_to_html
+from inline_parser import text_to_html_nodes
+from markdown_blocks import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node
+
+
+STAGES = (
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_html_nodes",
+    "to_html",
+    "tree_backend",
+    "string_backend",
+    "generate_page",
+    "copy_files_recursive",
+    "main",
+)
+
+
+class StageBench:
+    def __init__(self, site_dir, repeat):
+        self.site_dir = site_dir
+        self.repeat = repeat
+        self.content_dir = os.path.join(site_dir, "content")
+        self.static_dir = os.path.join(site_dir, "static")
+        self.template_path = os.path.join(site_dir, "template.html")
+        self.sources = []
+        for root, _, filenames in os.walk(self.content_dir):
+            for filename in sorted(filenames):
+                self.sources.append(os.path.join(root, filename))
+        self.pages = []
+        for path in self.sources:
+            with open(path, "r") as f:
+                self.pages.append(f.read())
+        self.blocks = [block for page in self.pages for block in markdown_to_blocks(page)]
+        self.inline_texts = [
+            " ".join(block.split("\n"))
+            for block in self.blocks
+            if block_to_block_type(block) == BlockType.PARAGRAPH
+        ]
+        self.trees = [markdown_to_html_node(page) for page in self.pages]
+
+    def run(self, stages):
+        results = {}
+        for stage in stages:
+            seconds, units = getattr(self, "bench_" + stage)()
+            results[stage] = {
+                "seconds": seconds,
+                "units": units,
+                "per_unit_us": seconds / units * 1e6 if units else None,
+            }
+        return results
+
+    def bench_markdown_to_blocks(self):
+        return best_of(self.repeat, lambda: [markdown_to_blocks(page) for page in self.pages]), len(self.pages)
+
+    def bench_block_to_block_type(self):
+        return best_of(self.repeat, lambda: [block_to_block_type(block) for block in self.blocks]), len(self.blocks)
+
+    def bench_text_to_html_nodes(self):
+        return best_of(self.repeat, lambda: [text_to_html_nodes(text) for text in self.inline_texts]), len(self.inline_texts)
+
+    def bench_to_html(self):
+        return best_of(self.repeat, lambda: [tree.to_html() for tree in self.trees]), len(self.trees)
+
+    def bench_tree_backend(self):
+        return best_of(self.repeat, lambda: [markdown_to_html_node(page).to_html() for page in self.pages]), len(self.pages)
+
+    def bench_string_backend(self):
+        return best_of(self.repeat, lambda: [markdown_to_html(page) for page in self.pages]), len(self.pages)
+
+    def bench_generate_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = iter(range(self.repeat))
+
+            def generate():
+                dest_dir = os.path.join(tmp, str(next(runs)))
+                for number, path in enumerate(self.sources):
+                    generate_page(path, self.template_path, os.path.join(dest_dir, f"{number}.html"), "/")
+            return self.quietly(generate), len(self.sources)
+
+    def bench_copy_files_recursive(self):
+        files = sum(len(filenames) for _, _, filenames in os.walk(self.static_dir))
+        with tempfile.TemporaryDirectory() as tmp:
+            dest_dir = os.path.join(tmp, "docs")
+
+            def copy():
+                shutil.rmtree(dest_dir, ignore_errors=True)
+                copy_files_recursive(self.static_dir, dest_dir)
+            return self.quietly(copy), files
+
+    def bench_main(self):
+        def build():
+            subprocess.run(
+                [sys.executable, os.path.join(SRC_DIR, "main.py"), "--no-document-cache", "--no-fragment-cache"],
+                cwd=self.site_dir,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+        return best_of(self.repeat, build), len(self.sources)
+
+    def quietly(self, func):
+        stdout = sys.stdout
+        with open(os.devnull, "w") as devnull:
+            sys.stdout = devnull
+            try:
+                return best_of(self.repeat, func)
+            finally:
+                sys.stdout = stdout
+
+
+def prepare_site(site_dir, generator):
+    generator.write(site_dir)
+    shutil.copy(os.path.join(ROOT_DIR, "template.html"), os.path.join(site_dir, "template.html"))
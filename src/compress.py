@@ -0,0 +1,106 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_EXTENSIONS = (".html", ".css", ".json", ".svg")
+DEFAULT_LEVEL = 9
+DEFAULT_MIN_BYTES = 1024
+SIDECAR_SUFFIX = ".gz"
+
+
+class SidecarCompressor:
+    def __init__(self, level=DEFAULT_LEVEL, min_bytes=DEFAULT_MIN_BYTES, extensions=DEFAULT_EXTENSIONS, jobs=1):
+        if not 1 <= level <= 9:
+            raise ValueError(f"invalid gzip level: {level}")
+        self.level = level
+        self.min_bytes = min_bytes
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.jobs = jobs
+        self.compressed = 0
+        self.current = 0
+        self.removed = 0
+
+    def wants(self, path, size):
+        return size >= self.min_bytes and path.lower().endswith(self.extensions)
+
+    def run(self, dest_root):
+        pending = []
+        for root, _, filenames in os.walk(dest_root):
+            names = set(filenames)
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                if filename.endswith(SIDECAR_SUFFIX):
+                    if self.sidecar_is_stale(filename[:-len(SIDECAR_SUFFIX)], names, root):
+                        os.remove(path)
+                        self.removed += 1
+                    continue
+                stat = os.stat(path)
+                if not self.wants(filename, stat.st_size):
+                    continue
+                if sidecar_is_current(path, stat):
+                    self.current += 1
+                else:
+                    pending.append(path)
+        if self.jobs > 1 and len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                list(executor.map(self.compress, pending))
+        else:
+            for path in pending:
+                self.compress(path)
+        self.compressed += len(pending)
+        return pending
+
+    def refresh(self, paths):
+        pending = []
+        for path in map(os.fspath, paths):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat is not None and self.wants(path, stat.st_size):
+                if sidecar_is_current(path, stat):
+                    self.current += 1
+                else:
+                    pending.append(path)
+            elif path.lower().endswith(DEFAULT_EXTENSIONS + self.extensions) and os.path.exists(path + SIDECAR_SUFFIX):
+                os.remove(path + SIDECAR_SUFFIX)
+                self.removed += 1
+        for path in pending:
+            self.compress(path)
+        self.compressed += len(pending)
+        return pending
+
+    def sidecar_is_stale(self, source_name, names, root):
+        if not source_name.lower().endswith(DEFAULT_EXTENSIONS + self.extensions):
+            return False
+        if source_name not in names:
+            return True
+        return not self.wants(source_name, os.path.getsize(os.path.join(root, source_name)))
+
+    def compress(self, path):
+        write_sidecar(path, self.level)
+
+    def summary(self):
+        return f"Gzip sidecars: {self.compressed} compressed, {self.current} current, {self.removed} removed"
+
+
+def sidecar_is_current(path, stat):
+    try:
+        sidecar = os.stat(path + SIDECAR_SUFFIX)
+    except OSError:
+        return False
+    return sidecar.st_mtime_ns == stat.st_mtime_ns
+
+
+def write_sidecar(path, level):
+    stat = os.stat(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    sidecar_path = path + SIDECAR_SUFFIX
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(filename="", mode="wb", compresslevel=level, fileobj=raw, mtime=0) as f:
+            f.write(data)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, sidecar_path)
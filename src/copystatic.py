@@ -1,16 +1,46 @@
+import hashlib
 import os
 import shutil
 
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
+def copy_files_recursive(source_dir_path, dest_dir_path, manifest=None, verify_hash=False):
     if not os.path.exists(dest_dir_path):
         os.mkdir(dest_dir_path)
 
     for filename in os.listdir(source_dir_path):
         from_path = os.path.join(source_dir_path, filename)
         dest_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {dest_path}")
         if os.path.isfile(from_path):
-            shutil.copy(from_path, dest_path)
+            if manifest is not None:
+                manifest.record_static(from_path, dest_path)
+                if file_is_current(from_path, dest_path, verify_hash):
+                    continue
+            print(f" * {from_path} -> {dest_path}")
+            shutil.copy2(from_path, dest_path)
         else:
-            copy_files_recursive(from_path, dest_path)
+            copy_files_recursive(from_path, dest_path, manifest, verify_hash)
+
+
+def file_is_current(from_path, dest_path, verify_hash=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    from_stat = os.stat(from_path)
+    if from_stat.st_size != dest_stat.st_size:
+        return False
+    if from_stat.st_mtime_ns == dest_stat.st_mtime_ns and not verify_hash:
+        return True
+    if not verify_hash or blake2_file(from_path) != blake2_file(dest_path):
+        return False
+    if from_stat.st_mtime_ns != dest_stat.st_mtime_ns:
+        shutil.copystat(from_path, dest_path)
+    return True
+
+
+def blake2_file(path):
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,53 @@
+import os
+
+
+class DependencyGraph:
+    def __init__(self):
+        self.inputs = {}
+        self.sources = {}
+        self.dependents = {}
+
+    @classmethod
+    def from_manifest(cls, manifest):
+        graph = cls()
+        for source, entry in manifest.pages.items():
+            graph.add(entry["output"], source, entry["inputs"])
+        for source, entry in manifest.static.items():
+            graph.add(entry["output"], source, [source])
+        return graph
+
+    def add(self, output, source, inputs):
+        output = os.path.normpath(output)
+        self.remove(output)
+        inputs = {os.path.normpath(path) for path in inputs}
+        self.inputs[output] = inputs
+        self.sources[output] = os.path.normpath(source)
+        for path in inputs:
+            self.dependents.setdefault(path, set()).add(output)
+
+    def remove(self, output):
+        output = os.path.normpath(output)
+        for path in self.inputs.pop(output, ()):
+            outputs = self.dependents[path]
+            outputs.discard(output)
+            if not outputs:
+                del self.dependents[path]
+        self.sources.pop(output, None)
+
+    def inputs_of(self, output):
+        return sorted(self.inputs.get(os.path.normpath(output), ()))
+
+    def source_of(self, output):
+        return self.sources.get(os.path.normpath(output))
+
+    def dependents_of(self, path):
+        return sorted(self.dependents.get(os.path.normpath(path), ()))
+
+    def affected(self, paths):
+        outputs = set()
+        for path in paths:
+            outputs.update(self.dependents.get(os.path.normpath(path), ()))
+        return sorted(outputs)
+
+    def __repr__(self):
+        return f"DependencyGraph({len(self.inputs)} outputs, {len(self.dependents)} inputs)"
@@ -0,0 +1,130 @@
+import hashlib
+import marshal
+import os
+
+from htmlnode import LeafNode, ParentNode, RenderedNode
+from manifest import parser_version
+
+
+DOCUMENT_FORMAT = 2
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+_active = None
+
+
+def active():
+    return _active
+
+
+def activate(cache):
+    global _active
+    previous = _active
+    _active = cache
+    return previous
+
+
+class DocumentCache:
+    def __init__(self, dir_path, version=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.dir_path = dir_path
+        self.max_bytes = max_bytes
+        self.version = version or parser_version()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, markdown):
+        return hashlib.sha256(markdown.encode()).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.dir_path, key[:2], key + ".bin")
+
+    def load(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                header, version, tree = marshal.load(f)
+            if header != DOCUMENT_FORMAT or version != self.version:
+                raise ValueError("stale document cache entry")
+            node = decode_node(tree)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            self.misses += 1
+            self.discard(key)
+            return None
+        self.hits += 1
+        return node
+
+    def store(self, key, node):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump((DOCUMENT_FORMAT, self.version, encode_node(node)), f)
+        os.replace(tmp_path, path)
+
+    def discard(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    def evict(self):
+        entries = []
+        total = 0
+        for root, _, filenames in os.walk(self.dir_path):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, path, stat.st_size))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+        evicted = 0
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        return evicted
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def merge_stats(self, stats):
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"Document cache: {self.hits} hits, {self.misses} misses ({rate:.1%} hit rate)"
+
+
+def encode_node(node):
+    if isinstance(node, ParentNode):
+        return ("p", node.tag, node.props, [encode_node(child) for child in node.children])
+    if isinstance(node, LeafNode):
+        return ("l", node.tag, node.value, node.props)
+    if isinstance(node, RenderedNode):
+        return ("r", node.tag, node.value, node.summary)
+    raise ValueError(f"cannot cache node: {node!r}")
+
+
+def decode_node(data):
+    kind = data[0]
+    if kind == "p":
+        return ParentNode(data[1], [decode_node(child) for child in data[3]], data[2])
+    if kind == "l":
+        return LeafNode(data[1], data[2], data[3])
+    if kind == "r":
+        return RenderedNode(data[1], data[2], data[3])
+    raise ValueError(f"invalid document cache node: {kind!r}")
@@ -0,0 +1,160 @@
+import hashlib
+import marshal
+import os
+import sqlite3
+import time
+
+from manifest import parser_version
+
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+MIN_BLOCK_BYTES = 256
+MAX_PENDING_BYTES = 4 * 1024 * 1024
+FRAGMENT_SCHEMA = 4
+
+_active = None
+
+
+def active():
+    return _active
+
+
+def activate(cache):
+    global _active
+    previous = _active
+    _active = cache
+    return previous
+
+
+class FragmentCache:
+    def __init__(
+        self,
+        path,
+        max_bytes=DEFAULT_MAX_BYTES,
+        min_block_bytes=MIN_BLOCK_BYTES,
+        version=None,
+        max_pending_bytes=MAX_PENDING_BYTES,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.min_block_bytes = min_block_bytes
+        self.max_pending_bytes = max_pending_bytes
+        self.version = version or parser_version()
+        self.hits = 0
+        self.misses = 0
+        self.pending = {}
+        self.pending_bytes = 0
+        self.touched = set()
+        self.connection = None
+
+    def connect(self):
+        if self.connection is not None:
+            return self.connection
+        dir_path = os.path.dirname(self.path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        try:
+            self.connection = self.open_database()
+        except sqlite3.DatabaseError:
+            os.remove(self.path)
+            self.connection = self.open_database()
+        return self.connection
+
+    def open_database(self):
+        connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != FRAGMENT_SCHEMA:
+                connection.execute("DROP TABLE IF EXISTS fragments")
+                connection.execute(f"PRAGMA user_version = {FRAGMENT_SCHEMA}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS fragments ("
+                "key TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, used INTEGER NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS fragments_used ON fragments (used)")
+            connection.commit()
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def key(self, block_type, text):
+        return hashlib.sha256(f"{self.version}\0{block_type}\0{text}".encode()).hexdigest()
+
+    def get(self, key):
+        data = self.pending.get(key)
+        if data is None:
+            row = self.connect().execute("SELECT data FROM fragments WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data = row[0]
+            self.touched.add(key)
+        try:
+            tag, html, summary = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            self.misses += 1
+            self.touched.discard(key)
+            return None
+        self.hits += 1
+        return tag, html, summary
+
+    def put(self, key, tag, html, summary=None):
+        data = marshal.dumps((tag, html, summary))
+        self.pending[key] = data
+        self.pending_bytes += len(data)
+        if self.pending_bytes > self.max_pending_bytes:
+            self.flush()
+
+    def flush(self):
+        if not self.pending and not self.touched:
+            return
+        now = time.time_ns()
+        connection = self.connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO fragments (key, data, size, used) VALUES (?, ?, ?, ?)",
+                [(key, data, len(data), now) for key, data in self.pending.items()],
+            )
+            connection.executemany(
+                "UPDATE fragments SET used = ? WHERE key = ?",
+                [(now, key) for key in self.touched],
+            )
+        self.pending = {}
+        self.pending_bytes = 0
+        self.touched = set()
+        self.evict()
+
+    def evict(self):
+        connection = self.connect()
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM fragments").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = []
+        rows = connection.execute("SELECT key, size FROM fragments ORDER BY used")
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        rows.close()
+        with connection:
+            connection.executemany("DELETE FROM fragments WHERE key = ?", evicted)
+        return len(evicted)
+
+    def close(self):
+        self.flush()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def merge_stats(self, stats):
+        self.hits += stats["hits"]
+        self.misses += stats["misses"]
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        return f"Fragment cache: {self.hits} hits, {self.misses} misses ({rate:.1%} hit rate)"
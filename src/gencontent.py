@@ -1,47 +1,322 @@
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 from pathlib import Path
-from markdown_blocks import markdown_to_html_node
+from doccache import DocumentCache, activate as activate_document_cache, active as active_document_cache
+from fragmentcache import FragmentCache, activate as activate_fragment_cache, active as active_fragment_cache
+from htmlwriter import HTMLStream, markdown_to_html
+from markdown_blocks import MarkdownStream, markdown_to_html_node
+from output import OutputWriter, activate as activate_output_writer, active as active_output_writer
+from pipeline import generate_pages_pipelined
+from profiler import BuildProfiler, activate, active, count_nodes, stage
+from renderers import activate as activate_renderers, active as active_renderers
+from siteindex import FirstParagraph, SiteIndex, first_paragraph, index_entry, page_url, summarize
+from template import load_template
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
+SMALL_PAGE_BYTES = 64 * 1024
+BATCH_BYTES = 256 * 1024
+BATCH_PAGES = 64
+STREAM_PAGE_BYTES = 8 * 1024 * 1024
+
+
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    basepath,
+    manifest=None,
+    jobs=1,
+    pipeline=None,
+    backend="tree",
+    shard=None,
+):
+    site_index = SiteIndex()
+    pages = discover_pages(dir_path_content, dest_dir_path)
+    site = site_context(load_template(template_path, basepath), pages, dest_dir_path)
+    if shard is not None:
+        pages = shard.select(pages, dir_path_content)
+    if manifest is not None:
+        stale_pages = []
+        for from_path, dest_path in pages:
+            entry = manifest.page_index(from_path)
+            if entry is not None and manifest.page_is_current(from_path, template_path, dest_path, basepath, site):
+                site_index.add(entry)
+            else:
+                stale_pages.append((from_path, dest_path))
+        pages = stale_pages
+
+    if jobs > 1 and len(pages) > 1:
+        page_infos = generate_pages_parallel(pages, template_path, basepath, jobs, backend, site)
+    elif pipeline is not None:
+        if active() is not None:
+            raise ValueError("the build profiler times pages one at a time and cannot run with a pipeline")
+        large_pages = [page for page in pages if os.path.getsize(page[0]) >= STREAM_PAGE_BYTES]
+        large = set(large_pages)
+        small_pages = [page for page in pages if page not in large]
+        page_infos = generate_pages_pipelined(
+            small_pages, template_path, basepath, partial(render_page, backend=backend, site=site), pipeline
+        )
+        for from_path, dest_path in large_pages:
+            page_infos[from_path] = generate_source_page(from_path, template_path, dest_path, basepath, backend, site)
+    else:
+        page_infos = {}
+        for from_path, dest_path in pages:
+            page_infos[from_path] = generate_source_page(from_path, template_path, dest_path, basepath, backend, site)
+
+    partials = load_template(template_path, basepath).partials if manifest is not None else ()
+    for from_path, dest_path in pages:
+        title, summary = page_infos[from_path]
+        entry = index_entry(from_path, dest_path, dest_dir_path, title, summary)
+        site_index.add(entry)
+        if manifest is not None:
+            manifest.record_page(from_path, template_path, dest_path, basepath, partials, entry, site)
+    return site_index
+
+
+def site_context(template, pages, dest_dir_path):
+    if "Pages" not in template.names():
+        return None
+    entries = []
+    for from_path, dest_path in pages:
+        try:
+            with open(from_path, "r") as from_file:
+                title = find_title(line.rstrip("\n") for line in from_file)
+        except (OSError, ValueError) as e:
+            raise ValueError(f"failed to generate {from_path}: {e}") from e
+        entries.append({"title": title, "url": page_url(dest_path, dest_dir_path)})
+    return {"Pages": sorted(entries, key=lambda entry: entry["url"])}
+
+
+def page_context(site, title, content):
+    return {**(site or {}), "Title": title, "Content": content}
+
+
+def discover_pages(dir_path_content, dest_dir_path):
+    pages = []
     for filename in os.listdir(dir_path_content):
         from_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename)
         if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path, basepath)
+            pages.append((from_path, Path(dest_path).with_suffix(".html")))
         else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            pages.extend(discover_pages(from_path, dest_path))
+    return pages
+
+
+def generate_pages_parallel(pages, template_path, basepath, jobs, backend="tree", site=None):
+    batches = schedule_page_batches(pages)
+    build_profiler = active()
+    output_writer = active_output_writer()
+    page_infos = {}
+    fragment_cache = active_fragment_cache()
+    fragment_options = None
+    if fragment_cache is not None:
+        fragment_options = (fragment_cache.path, fragment_cache.max_bytes, fragment_cache.min_block_bytes)
+    document_cache = active_document_cache()
+    document_cache_dir = document_cache.dir_path if document_cache is not None else None
+    registry = worker_renderers()
+    with ProcessPoolExecutor(max_workers=jobs, initializer=activate_renderers, initargs=(registry,)) as executor:
+        futures = [
+            executor.submit(
+                generate_page_batch,
+                batch,
+                template_path,
+                basepath,
+                build_profiler is not None,
+                fragment_options,
+                document_cache_dir,
+                backend,
+                site,
+            )
+            for batch in batches
+        ]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                output_writer.merge_stats(result["output"])
+                page_infos.update(result["pages"])
+                if build_profiler is not None:
+                    build_profiler.merge(result["profile"])
+                if fragment_cache is not None:
+                    fragment_cache.merge_stats(result["fragments"])
+                if document_cache is not None:
+                    document_cache.merge_stats(result["documents"])
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+    return page_infos
+
+
+def worker_renderers():
+    registry = active_renderers()
+    try:
+        pickle.dumps(registry)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        raise ValueError(f"custom renderer handlers must be module-level functions to render with --jobs > 1: {e}") from e
+    return registry
+
+
+def schedule_page_batches(pages):
+    sized_pages = sorted(
+        ((os.path.getsize(from_path), from_path, dest_path) for from_path, dest_path in pages),
+        key=lambda page: page[0],
+        reverse=True,
+    )
+    batches = []
+    batch = []
+    batch_bytes = 0
+    for size, from_path, dest_path in sized_pages:
+        if size >= SMALL_PAGE_BYTES:
+            batches.append([(from_path, dest_path)])
+            continue
+        if batch and (batch_bytes + size > BATCH_BYTES or len(batch) >= BATCH_PAGES):
+            batches.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append((from_path, dest_path))
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def generate_page_batch(
+    batch,
+    template_path,
+    basepath,
+    profile=False,
+    fragment_options=None,
+    document_cache_dir=None,
+    backend="tree",
+    site=None,
+):
+    build_profiler = BuildProfiler() if profile else None
+    fragment_cache = FragmentCache(*fragment_options) if fragment_options is not None else None
+    document_cache = DocumentCache(document_cache_dir) if document_cache_dir is not None else None
+    output_writer = OutputWriter()
+    previous = activate(build_profiler)
+    previous_output_writer = activate_output_writer(output_writer)
+    previous_fragment_cache = activate_fragment_cache(fragment_cache)
+    previous_document_cache = activate_document_cache(document_cache)
+    page_infos = {}
+    try:
+        for from_path, dest_path in batch:
+            page_infos[from_path] = generate_source_page(from_path, template_path, dest_path, basepath, backend, site)
+    finally:
+        activate(previous)
+        activate_fragment_cache(previous_fragment_cache)
+        activate_document_cache(previous_document_cache)
+        activate_output_writer(previous_output_writer)
+        if fragment_cache is not None:
+            fragment_cache.close()
+    return {
+        "profile": build_profiler.to_data() if build_profiler is not None else None,
+        "fragments": fragment_cache.stats() if fragment_cache is not None else None,
+        "documents": document_cache.stats() if document_cache is not None else None,
+        "output": output_writer.stats(),
+        "pages": page_infos,
+    }
+
+
+def generate_source_page(from_path, template_path, dest_path, basepath, backend="tree", site=None):
+    try:
+        return generate_page(from_path, template_path, dest_path, basepath, backend, site)
+    except Exception as e:
+        raise ValueError(f"failed to generate {from_path}: {e}") from e
 
 
-def generate_page(from_path, template_path, dest_path, basepath):
+def generate_page(from_path, template_path, dest_path, basepath, backend="tree", site=None):
     print(f" * {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
+    if os.path.getsize(from_path) >= STREAM_PAGE_BYTES:
+        return generate_page_streamed(from_path, template_path, dest_path, basepath, backend, site)
+    build_profiler = active()
+    if build_profiler is not None:
+        with build_profiler.page_timer(str(from_path)):
+            return generate_page_profiled(
+                from_path, template_path, dest_path, basepath, build_profiler, backend, site
+            )
 
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
+    with open(from_path, "r") as from_file:
+        markdown_content = from_file.read()
+
+    template = load_template(template_path, basepath)
+
+    content, paragraph = render_content(markdown_content, basepath, backend)
+    title = extract_title(markdown_content)
+
+    with active_output_writer().open(dest_path) as to_file:
+        template.render_to(to_file, page_context(site, title, content))
+    return title, summarize(paragraph)
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
 
+def generate_page_streamed(from_path, template_path, dest_path, basepath, backend="tree", site=None):
+    template = load_template(template_path, basepath)
+    with open(from_path, "r") as from_file:
+        title = find_title(line.rstrip("\n") for line in from_file)
+
+    with open(from_path, "r") as from_file, active_output_writer().open(dest_path) as to_file:
+        paragraph = FirstParagraph()
+        lines = (line.rstrip("\n") for line in from_file)
+        if backend == "string":
+            stream = HTMLStream(lines, paragraph.add_block)
+        else:
+            stream = MarkdownStream(lines, paragraph.add)
+        template.render_to(to_file, page_context(site, title, stream))
+    return title, summarize(paragraph.text)
+
+
+def render_page(markdown_content, template, backend="tree", site=None):
+    content, paragraph = render_content(markdown_content, template.basepath, backend)
     title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    template = template.replace('href="/', 'href="' + basepath)
-    template = template.replace('src="/', 'src="' + basepath)
+    page = template.render(page_context(site, title, content))
+    return page, (title, summarize(paragraph))
 
-    dest_dir_path = os.path.dirname(dest_path)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
+
+def render_content(markdown_content, basepath, backend="tree"):
+    if backend == "string":
+        paragraph = FirstParagraph()
+        return markdown_to_html(markdown_content, basepath, paragraph.add_block), paragraph.text
+    node = markdown_to_html_node(markdown_content)
+    return node, first_paragraph(node)
+
+
+def generate_page_profiled(from_path, template_path, dest_path, basepath, build_profiler, backend="tree", site=None):
+    with stage("read"):
+        with open(from_path, "r") as from_file:
+            markdown_content = from_file.read()
+
+    with stage("template"):
+        template = load_template(template_path, basepath)
+
+    if backend == "string":
+        html, paragraph = render_content(markdown_content, basepath, backend)
+        nodes = 0
+    else:
+        node = markdown_to_html_node(markdown_content)
+        with stage("serialize"):
+            html = node.to_html(basepath)
+        paragraph = first_paragraph(node)
+        nodes = count_nodes(node)
+    with stage("title"):
+        title = extract_title(markdown_content)
+
+    with stage("template"):
+        page = template.render(page_context(site, title, html))
+
+    with stage("write"):
+        active_output_writer().write_text(dest_path, page)
+    build_profiler.count(nodes=nodes, bytes_written=len(page.encode()))
+    return title, summarize(paragraph)
 
 
 def extract_title(md):
-    lines = md.split("\n")
+    return find_title(md.split("\n"))
+
+
+def find_title(lines):
     for line in lines:
         if line.startswith("# "):
             return line[2:]
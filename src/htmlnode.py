@@ -1,5 +1,17 @@
+URL_PROPS = ("href", "src")
+
+ROOT_MARKER = "\0root\0"
+
+TEXT_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+ATTRIBUTE_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
+
 class HTMLNode:
 
+    __slots__ = ("tag", "value", "children", "props")
+
+
     def __init__(self, tag = None, value = None, children = None, props = None):
 
         self.tag = tag
@@ -8,27 +20,70 @@ class HTMLNode:
 
         self.children = children
 
-        self.props = props
+        self.props = props or None
 
 
-    def to_html(self):
+    def to_html(self, basepath="/"):
 
         raise NotImplementedError()
 
 
-    def props_to_html(self):
+    def iter_html(self, basepath="/"):
+
+        stack = [self]
+
+        while stack:
+
+            node = stack.pop()
+
+            if isinstance(node, str):
+
+                yield node
+
+            elif isinstance(node, ParentNode):
+
+                if node.tag is None:
+
+                    raise ValueError("invalid HTML: no tag")
+
+                if node.children is None:
+
+                    raise ValueError("invalid HTML: no children")
+
+                yield f"<{node.tag}{node.props_to_html(basepath)}>"
+
+                stack.append(f"</{node.tag}>")
+
+                stack.extend(reversed(node.children))
+
+            else:
+
+                yield node.to_html(basepath)
+
+
+    def write_html(self, fp, basepath="/"):
+
+        write = fp.write
+
+        for chunk in self.iter_html(basepath):
+
+            write(chunk)
+
+
+    def props_to_html(self, basepath="/"):
 
         if self.props is None:
 
             return ""
 
-        props_html = ""
+        if basepath == "/":
 
-        for prop in self.props:
+            return "".join([f' {prop}="{escape_attribute(value)}"' for prop, value in self.props.items()])
 
-            props_html += f' {prop}="{self.props[prop]}"'
-
-        return props_html
+        return "".join([
+            f' {prop}="{escape_attribute(rewrite_root_url(prop, value, basepath))}"'
+            for prop, value in self.props.items()
+        ])
 
 
     def __repr__(self):
@@ -37,12 +92,15 @@ class HTMLNode:
 
 class LeafNode(HTMLNode):
 
+    __slots__ = ()
+
+
     def __init__(self, tag, value, props = None):
 
         super().__init__(tag , value, None, props)
 
 
-    def to_html(self):
+    def to_html(self, basepath="/"):
 
         if self.value is None:
 
@@ -50,9 +108,9 @@ class LeafNode(HTMLNode):
 
         if self.tag is None:
 
-            return self.value
+            return escape_text(self.value)
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html(basepath)}>{escape_text(self.value)}</{self.tag}>"
 
 
     def __repr__(self):
@@ -62,34 +120,65 @@ class LeafNode(HTMLNode):
 
 class ParentNode(HTMLNode):
 
+    __slots__ = ()
+
+
     def __init__(self, tag, children, props = None):
 
         super().__init__(tag , None, children , props)
 
 
-    def to_html(self):
+    def to_html(self, basepath="/"):
 
-        if self.tag is None:
+        return "".join(self.iter_html(basepath))
+
+
+    def __repr__(self):
+
+        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
 
-            raise ValueError("invalid HTML: no tag")
 
-        if self.children is None:
 
-            raise ValueError("invalid HTML: no children")
+class RenderedNode(HTMLNode):
 
-        
+    __slots__ = ("summary",)
 
-        children_html = ""
+    def __init__(self, tag, html, summary=None):
 
-        for child in self.children:
+        super().__init__(tag, html, None, None)
 
-            children_html += child.to_html()
+        self.summary = summary
 
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+    def to_html(self, basepath="/"):
 
+        return self.value.replace(ROOT_MARKER, escape_attribute(basepath))
 
     def __repr__(self):
 
-        return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
+        return f"RenderedNode({self.tag}, {self.value!r})"
+
+def rewrite_root_url(prop, value, basepath):
+
+    if prop in URL_PROPS and value.startswith("/"):
+
+        return basepath + value[1:]
+
+    return value
+
+
+def escape_text(text):
+
+    if "&" not in text and "<" not in text and ">" not in text:
+
+        return text
+
+    return text.translate(TEXT_ESCAPES)
+
+
+def escape_attribute(value):
+
+    if '"' not in value and "&" not in value and "<" not in value and ">" not in value:
 
+        return value
 
+    return value.translate(ATTRIBUTE_ESCAPES)
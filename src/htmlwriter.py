@@ -0,0 +1,112 @@
+from htmlnode import escape_text
+from inline_parser import text_to_html
+from markdown_blocks import (
+    code_text,
+    code_to_html_node,
+    heading_parts,
+    heading_to_html_node,
+    lines_to_html_node,
+    olist_to_html_node,
+    paragraph_to_html_node,
+    quote_text,
+    quote_to_html_node,
+    scan_blocks,
+    ulist_to_html_node,
+)
+from profiler import stage
+from renderers import active as active_renderers
+from textnode import BUILTIN_INLINE_HANDLERS
+
+
+BACKENDS = ("tree", "string")
+
+
+def markdown_to_html(markdown, basepath="/", on_block=None):
+    with stage("block_split"):
+        blocks = list(scan_blocks(markdown.split("\n")))
+    out = ["<div>"]
+    with stage("string_build"):
+        writer = HTMLWriter(out, basepath)
+        for block_type, lines in blocks:
+            if on_block is not None:
+                on_block(block_type, lines)
+            writer.write_block(block_type, lines)
+    out.append("</div>")
+    return "".join(out)
+
+
+class HTMLStream:
+    def __init__(self, lines, on_block=None):
+        self.lines = lines
+        self.on_block = on_block
+
+    def iter_html(self, basepath="/"):
+        yield "<div>"
+        out = []
+        writer = HTMLWriter(out, basepath)
+        for block_type, lines in scan_blocks(self.lines):
+            if self.on_block is not None:
+                self.on_block(block_type, lines)
+            writer.write_block(block_type, lines)
+            yield "".join(out)
+            out.clear()
+        yield "</div>"
+
+
+class HTMLWriter:
+    def __init__(self, out, basepath="/"):
+        self.out = out
+        self.basepath = basepath
+        self.registry = active_renderers()
+        self.builtin_inline = all(
+            self.registry.inline_handlers.get(text_type) is handler
+            for text_type, handler in BUILTIN_INLINE_HANDLERS.items()
+        )
+
+    def write_block(self, block_type, lines):
+        write = BLOCK_WRITERS.get(self.registry.block_handlers.get(block_type))
+        if write is None or not self.builtin_inline:
+            self.out.extend(lines_to_html_node(block_type, lines).iter_html(self.basepath))
+            return
+        with stage(self.registry.stage_names[block_type]):
+            write(self, lines)
+
+    def inline(self, text):
+        with stage("inline_parse"):
+            return text_to_html(text, self.basepath)
+
+    def write_paragraph(self, lines):
+        self.out.append(f"<p>{self.inline(' '.join(lines))}</p>")
+
+    def write_heading(self, lines):
+        tag, text = heading_parts(lines)
+        self.out.append(f"<{tag}>{self.inline(text)}</{tag}>")
+
+    def write_code(self, lines):
+        self.out.append(f"<pre><code>{escape_text(code_text(lines))}</code></pre>")
+
+    def write_quote(self, lines):
+        self.out.append(f"<blockquote>{self.inline(quote_text(lines))}</blockquote>")
+
+    def write_olist(self, lines):
+        self.write_list("ol", [item[3:] for item in lines])
+
+    def write_ulist(self, lines):
+        self.write_list("ul", [item[2:] for item in lines])
+
+    def write_list(self, tag, items):
+        out = self.out
+        out.append(f"<{tag}>")
+        for text in items:
+            out.append(f"<li>{self.inline(text)}</li>")
+        out.append(f"</{tag}>")
+
+
+BLOCK_WRITERS = {
+    paragraph_to_html_node: HTMLWriter.write_paragraph,
+    heading_to_html_node: HTMLWriter.write_heading,
+    code_to_html_node: HTMLWriter.write_code,
+    quote_to_html_node: HTMLWriter.write_quote,
+    olist_to_html_node: HTMLWriter.write_olist,
+    ulist_to_html_node: HTMLWriter.write_ulist,
+}
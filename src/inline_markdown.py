@@ -3,23 +3,191 @@ import re
 from textnode import TextNode, TextType
 
 
+INLINE_SPECIAL = re.compile(r"!\[|\[|_|\*\*|`")
+
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+LINK_PATTERN = re.compile(r"\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
+# Legacy flat TextNode API. Pages are parsed by inline_parser, which nests
+# emphasis and treats intraword underscores as text; this scanner keeps the
+# original split_nodes_* semantics, so an unmatched _ in snake_case raises.
 def text_to_textnodes(text):
 
-    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = []
+
+    image_count = 0
+
+    link_error = False
+
+    delimiter_error = False
+
+    fragment_start = 0
+
+    links_in_fragment = 0
+
+    section_start = 0
+
+    italic = bold = code = False
+
+    pos = 0
+
+    image = IMAGE_PATTERN.search(text)
+
+    while True:
+
+        match = INLINE_SPECIAL.search(text, pos)
+
+        end = len(text) if match is None else match.start()
+
+        token = None if match is None else match.group()
+
+        if token == "![":
+
+            link = image if image is not None and image.start() == end else None
+
+        elif token == "[":
+
+            limit = len(text) if image is None else image.start()
+
+            link = LINK_PATTERN.match(text, end, limit)
+
+        if (token == "![" or token == "[") and link is None:
+
+            pos = match.end()
+
+            continue
+
+        if token is None or token == "![" or token == "[":
+
+            if italic or bold or code:
+
+                delimiter_error = True
+
+            italic = bold = code = False
+
+            if end > section_start:
+
+                nodes.append(TextNode(text[section_start:end], TextType.TEXT))
+
+            if token is None or token == "![":
+
+                if links_in_fragment == 0 and link_section_not_closed(text[fragment_start:end]):
+
+                    link_error = True
+
+                links_in_fragment = 0
+
+            if token is None:
+
+                break
+
+            if token == "![":
+
+                image_count += 1
+
+                nodes.append(TextNode(link.group(1), TextType.IMAGE, link.group(2)))
+
+                fragment_start = link.end()
+
+                image = IMAGE_PATTERN.search(text, fragment_start)
+
+            else:
+
+                links_in_fragment += 1
+
+                nodes.append(TextNode(link.group(1), TextType.LINK, link.group(2)))
+
+            pos = section_start = link.end()
+
+            continue
+
+        if token == "_":
+
+            if not italic and (bold or code):
+
+                delimiter_error = True
+
+            bold = code = False
+
+            text_type = TextType.ITALIC if italic else TextType.TEXT
+
+            italic = not italic
+
+        elif italic:
 
-    nodes = split_nodes_image(nodes)                               
+            pos = match.end()
 
-    nodes = split_nodes_link(nodes)   
+            continue
+
+        elif token == "**":
+
+            if code:
+
+                delimiter_error = True
+
+            code = False
+
+            text_type = TextType.BOLD if bold else TextType.TEXT
+
+            bold = not bold
+
+        elif bold:
+
+            pos = match.end()
+
+            continue
 
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)                              
+        else:
 
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)      
+            text_type = TextType.CODE if code else TextType.TEXT
 
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)       
+            code = not code
+
+        if end > section_start:
+
+            nodes.append(TextNode(text[section_start:end], text_type))
+
+        pos = section_start = match.end()
+
+    if image_count == 0:
+
+        check_image_sections(text)
+
+    if link_error:
+
+        raise ValueError("invalid markdown, link section not closed or mismatched")
+
+    if delimiter_error:
+
+        raise ValueError("invalid markdown, formatted section not closed")
 
     return nodes
 
 
+
+def check_image_sections(text):
+
+    if "!" not in text:
+
+        return
+
+    if "[" in text and ("]" not in text or "(" not in text or ")" not in text):
+
+        raise ValueError("invalid markdown, image section not closed or mismatched")
+
+    if "[" not in text and "]" in text and "(" in text:
+
+        raise ValueError("invalid markdown, stray '!' or malformed image syntax")
+
+
+
+def link_section_not_closed(text):
+
+    return "[" in text and ("]" not in text or "(" not in text or ")" not in text)
+
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     new_nodes = []
@@ -0,0 +1,302 @@
+import re
+import unicodedata
+from collections import deque
+
+from htmlnode import LeafNode, escape_attribute, escape_text, rewrite_root_url
+from renderers import active as active_renderers
+from textnode import TextType
+
+
+INLINE_TOKEN = re.compile(r"!\[|[\[\]_*`]")
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_DESTINATION = re.compile(r"\(([^\(\)]*)\)")
+BACKTICK_RUN = re.compile(r"`+")
+DELIMITER_RUNS = {"_": re.compile(r"_+"), "*": re.compile(r"\*+")}
+MIN_DELIMITER_RUN = {"_": 1, "*": 2}
+EMPHASIS_TYPES = {1: TextType.ITALIC, 2: TextType.BOLD}
+
+
+class Run:
+    __slots__ = ("value", "previous", "next")
+
+    def __init__(self, value):
+        self.value = value
+        self.previous = None
+        self.next = None
+
+
+class Delimiter:
+    __slots__ = ("run", "char", "can_open", "can_close", "previous", "next")
+
+    def __init__(self, run, char, can_open, can_close):
+        self.run = run
+        self.char = char
+        self.can_open = can_open
+        self.can_close = can_close
+        self.previous = None
+        self.next = None
+
+
+class Bracket:
+    __slots__ = ("run", "bottom")
+
+    def __init__(self, run, bottom):
+        self.run = run
+        self.bottom = bottom
+
+
+class Fragment(str):
+    __slots__ = ()
+
+
+class TreeBuilder:
+    def __init__(self):
+        self.render = active_renderers().render_inline
+
+    def text(self, value):
+        return LeafNode(None, value)
+
+    def code(self, value):
+        return self.render(TextType.CODE, [LeafNode(None, value)])
+
+    def image(self, alt, src):
+        return self.render(TextType.IMAGE, [LeafNode(None, alt)], src)
+
+    def element(self, text_type, children, url=None):
+        return self.render(text_type, children, url)
+
+    def finish(self, children):
+        return children
+
+
+class HTMLBuilder:
+    def __init__(self, basepath="/"):
+        self.basepath = basepath
+
+    def text(self, value):
+        return Fragment(escape_text(value))
+
+    def code(self, value):
+        return Fragment(f"<code>{escape_text(value)}</code>")
+
+    def image(self, alt, src):
+        return Fragment(f'<img src="{self.url("src", src)}" alt="{escape_attribute(alt)}"></img>')
+
+    def element(self, text_type, children, url=None):
+        if text_type == TextType.LINK:
+            return Fragment(f'<a href="{self.url("href", url)}">{"".join(children)}</a>')
+        tag = "b" if text_type == TextType.BOLD else "i"
+        return Fragment(f"<{tag}>{''.join(children)}</{tag}>")
+
+    def finish(self, children):
+        return "".join(children)
+
+    def url(self, prop, value):
+        return escape_attribute(rewrite_root_url(prop, value, self.basepath))
+
+
+def text_to_html_nodes(text):
+    return InlineParser(text, TreeBuilder()).parse()
+
+
+def text_to_html(text, basepath="/"):
+    return InlineParser(text, HTMLBuilder(basepath)).parse()
+
+
+class InlineParser:
+    def __init__(self, text, builder):
+        self.text = text
+        self.head = Run(None)
+        self.tail = self.head
+        self.delimiters = None
+        self.brackets = []
+        self.backticks = None
+        self.builder = builder
+
+    def parse(self):
+        text = self.text
+        pos = start = 0
+        while True:
+            match = INLINE_TOKEN.search(text, pos)
+            if match is None:
+                break
+            token = match.group()
+            end = match.start()
+            if token == "`":
+                opening = BACKTICK_RUN.match(text, end)
+                closing = self.find_backticks(len(opening.group()), opening.end())
+                if closing is None:
+                    pos = opening.end()
+                    continue
+                self.append_text(text[start:end])
+                self.append(self.builder.code(text[opening.end():closing]))
+                pos = start = closing + len(opening.group())
+            elif token == "![":
+                image = IMAGE_PATTERN.match(text, end)
+                if image is None:
+                    pos = end + 1
+                    continue
+                self.append_text(text[start:end])
+                self.append(self.builder.image(image.group(1), image.group(2)))
+                pos = start = image.end()
+            elif token == "[":
+                self.append_text(text[start:end])
+                self.brackets.append(Bracket(self.append("["), self.delimiters))
+                pos = start = end + 1
+            elif token == "]":
+                destination = LINK_DESTINATION.match(text, end + 1)
+                if not self.brackets or destination is None:
+                    if self.brackets:
+                        self.brackets.pop()
+                    pos = end + 1
+                    continue
+                self.append_text(text[start:end])
+                self.close_link(self.brackets.pop(), destination.group(1))
+                pos = start = destination.end()
+            else:
+                delimiter_run = DELIMITER_RUNS[token].match(text, end)
+                pos = delimiter_run.end()
+                can_open, can_close = delimiter_flanking(text, token, end, pos)
+                if len(delimiter_run.group()) < MIN_DELIMITER_RUN[token] or not (can_open or can_close):
+                    continue
+                self.append_text(text[start:end])
+                self.push_delimiter(Delimiter(self.append(delimiter_run.group()), token, can_open, can_close))
+                start = pos
+        self.append_text(text[start:])
+        self.process_emphasis(None)
+        return self.builder.finish(self.take_after(self.head, None))
+
+    def append(self, value):
+        run = Run(value)
+        run.previous = self.tail
+        self.tail.next = run
+        self.tail = run
+        return run
+
+    def append_text(self, text):
+        if text:
+            self.append(text)
+
+    def find_backticks(self, length, pos):
+        if self.backticks is None:
+            self.backticks = {}
+            for run in BACKTICK_RUN.finditer(self.text):
+                self.backticks.setdefault(len(run.group()), deque()).append(run.start())
+        starts = self.backticks.get(length)
+        while starts and starts[0] < pos:
+            starts.popleft()
+        return starts[0] if starts else None
+
+    def close_link(self, bracket, href):
+        self.process_emphasis(bracket.bottom)
+        children = self.take_after(bracket.run, None)
+        bracket.run.value = self.builder.element(TextType.LINK, children, href)
+        self.brackets.clear()
+
+    def push_delimiter(self, delimiter):
+        delimiter.previous = self.delimiters
+        if self.delimiters is not None:
+            self.delimiters.next = delimiter
+        self.delimiters = delimiter
+
+    def remove_delimiter(self, delimiter):
+        if delimiter.previous is not None:
+            delimiter.previous.next = delimiter.next
+        if delimiter.next is not None:
+            delimiter.next.previous = delimiter.previous
+        else:
+            self.delimiters = delimiter.previous
+
+    def process_emphasis(self, bottom):
+        if self.delimiters is bottom:
+            return
+        closer = self.delimiters
+        while closer.previous is not bottom:
+            closer = closer.previous
+        openers_bottom = {"_": bottom, "*": bottom}
+        while closer is not None:
+            if not closer.can_close:
+                closer = closer.next
+                continue
+            opener = closer.previous
+            while opener is not bottom and opener is not openers_bottom[closer.char]:
+                if opener.char == closer.char and opener.can_open:
+                    break
+                opener = opener.previous
+            else:
+                openers_bottom[closer.char] = closer.previous
+                following = closer.next
+                if not closer.can_open:
+                    self.remove_delimiter(closer)
+                closer = following
+                continue
+            length = 2 if len(opener.run.value) >= 2 and len(closer.run.value) >= 2 else 1
+            while opener.next is not closer:
+                self.remove_delimiter(opener.next)
+            opener.run.value = opener.run.value[length:]
+            closer.run.value = closer.run.value[length:]
+            children = self.take_after(opener.run, closer.run)
+            self.insert_after(opener.run, self.builder.element(EMPHASIS_TYPES[length], children))
+            if len(opener.run.value) < MIN_DELIMITER_RUN[opener.char]:
+                self.remove_delimiter(opener)
+            if len(closer.run.value) < MIN_DELIMITER_RUN[closer.char]:
+                following = closer.next
+                self.remove_delimiter(closer)
+                closer = following
+        while self.delimiters is not bottom:
+            self.remove_delimiter(self.delimiters)
+
+    def insert_after(self, run, value):
+        inserted = Run(value)
+        inserted.previous = run
+        inserted.next = run.next
+        if run.next is not None:
+            run.next.previous = inserted
+        else:
+            self.tail = inserted
+        run.next = inserted
+
+    def take_after(self, first, last):
+        children = []
+        text = []
+        run = first.next
+        while run is not last:
+            if type(run.value) is str:
+                text.append(run.value)
+            else:
+                if text:
+                    self.append_text_child(children, text)
+                    text = []
+                children.append(run.value)
+            run = run.next
+        if text:
+            self.append_text_child(children, text)
+        first.next = last
+        if last is None:
+            self.tail = first
+        else:
+            last.previous = first
+        return children
+
+    def append_text_child(self, children, text):
+        value = "".join(text)
+        if value:
+            children.append(self.builder.text(value))
+
+
+def delimiter_flanking(text, char, start, end):
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    left = not after.isspace() and (
+        not is_punctuation(after) or before.isspace() or is_punctuation(before)
+    )
+    right = not before.isspace() and (
+        not is_punctuation(before) or after.isspace() or is_punctuation(after)
+    )
+    if char == "_":
+        return left and (not right or is_punctuation(before)), right and (not left or is_punctuation(after))
+    return left, right
+
+
+def is_punctuation(char):
+    return unicodedata.category(char)[0] in "PS"
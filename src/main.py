@@ -1,32 +1,439 @@
+import argparse
+import cProfile
 import os
-import shutil
 import sys
+import time
+from functools import partial
 
+from compress import DEFAULT_EXTENSIONS, DEFAULT_LEVEL, DEFAULT_MIN_BYTES, SIDECAR_SUFFIX, SidecarCompressor
 from copystatic import copy_files_recursive
+from depgraph import DependencyGraph
+from doccache import (
+    DEFAULT_MAX_BYTES as DEFAULT_DOCUMENT_CACHE_BYTES,
+    DocumentCache,
+    activate as activate_document_cache,
+)
+from fragmentcache import DEFAULT_MAX_BYTES, FragmentCache, activate as activate_fragment_cache
 from gencontent import generate_pages_recursive
+from htmlwriter import BACKENDS
+from manifest import BuildManifest
+from output import OutputWriter, activate as activate_output_writer
+from pipeline import DEFAULT_IO_WORKERS, DEFAULT_READ_AHEAD, DEFAULT_WRITE_BEHIND, PipelineConfig
+from profiler import BuildProfiler, activate, print_summary, stage
+from shard import SHARD_MANIFEST, SHARD_OUTPUT, SHARD_STRATEGIES, merge_shards, parse_shard
+from siteindex import FEED_ENTRIES, absolute_url
+from watch import SiteRebuilder, watch
 
 
 dir_path_static = "./static"
 dir_path_public = "./docs"
 dir_path_content = "./content"
 template_path = "./template.html"
+manifest_path = "./.cache/build-manifest.json"
+default_profile_path = "./.cache/build-profile.json"
+fragment_cache_path = "./.cache/fragments.sqlite3"
+document_cache_path = "./.cache/documents"
 default_basepath = "/"
+default_feed_section = "./content/blog"
+default_shard_dir = "./shards"
+sitemap_path = "./docs/sitemap.xml"
+feed_path = "./docs/atom.xml"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Build the static site into ./docs",
+        epilog="Run `main.py merge --help` to combine --shard builds into ./docs.",
+    )
+    parser.add_argument("basepath", nargs="?", default=default_basepath)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages whose inputs changed and sync changed static files",
+    )
+    parser.add_argument(
+        "--verify-static-hash",
+        action="store_true",
+        help="when syncing static files, compare BLAKE2 hashes as well as size and mtime",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="render pages in N worker processes (0 means one per CPU)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading, rendering and writing pages with an asyncio pipeline",
+    )
+    parser.add_argument(
+        "--read-ahead",
+        type=int,
+        default=DEFAULT_READ_AHEAD,
+        metavar="N",
+        help="markdown files --pipeline keeps read ahead of rendering",
+    )
+    parser.add_argument(
+        "--write-behind",
+        type=int,
+        default=DEFAULT_WRITE_BEHIND,
+        metavar="N",
+        help="rendered pages --pipeline buffers before they are written",
+    )
+    parser.add_argument(
+        "--io-workers",
+        type=int,
+        default=DEFAULT_IO_WORKERS,
+        metavar="N",
+        help="concurrent file reads and writes used by --pipeline",
+    )
+    add_gzip_arguments(parser)
+    add_site_index_arguments(parser)
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building, serve ./docs, rebuild on changes and live-reload open pages",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port used by --watch")
+    parser.add_argument(
+        "--affected-by",
+        action="append",
+        metavar="PATH",
+        help="list the outputs the last build made from PATH and exit (may be repeated)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each build stage per page and write a JSON report",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default=default_profile_path,
+        metavar="PATH",
+        help=f"where --profile writes its report (default {default_profile_path})",
+    )
+    parser.add_argument("--profile-top", type=int, default=10, help="slowest pages listed in the profile")
+    parser.add_argument(
+        "--cprofile",
+        metavar="PATH",
+        help="dump cProfile stats for the build process to PATH",
+    )
+    parser.add_argument(
+        "--render-backend",
+        choices=BACKENDS,
+        default="tree",
+        help="build an HTMLNode tree per page, or write HTML strings directly (string skips the parse caches)",
+    )
+    parser.add_argument(
+        "--no-document-cache",
+        action="store_true",
+        help="always re-parse markdown instead of loading parsed trees from earlier builds",
+    )
+    parser.add_argument(
+        "--document-cache-size",
+        type=int,
+        default=DEFAULT_DOCUMENT_CACHE_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="evict least recently used parsed documents beyond this size",
+    )
+    parser.add_argument(
+        "--no-fragment-cache",
+        action="store_true",
+        help="do not reuse rendered HTML of repeated blocks from earlier builds",
+    )
+    parser.add_argument(
+        "--fragment-cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        metavar="MB",
+        help="evict least recently used fragments beyond this size",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="render only the I-th of N slices of the content into SHARD_DIR/I-of-N; combine them with merge",
+    )
+    parser.add_argument(
+        "--shard-strategy",
+        choices=SHARD_STRATEGIES,
+        default="hash",
+        help="split content by stable path hash or into size-balanced bins",
+    )
+    add_shard_dir_argument(parser)
+    args = parser.parse_args()
+    if args.pipeline and args.profile:
+        parser.error("--profile times pages one at a time and cannot be combined with --pipeline; use --cprofile")
+    if args.shard is not None:
+        try:
+            args.shard = parse_shard(args.shard, args.shard_strategy)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.watch:
+            parser.error("--watch cannot be combined with --shard")
+        if args.site_url or args.gzip:
+            parser.error("--site-url and --gzip apply to the whole site, pass them to merge")
+    return parser, args
+
+
+def parse_merge_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py merge",
+        description="Combine --shard builds, the static files and the sitemap and feed into ./docs",
+    )
+    add_shard_dir_argument(parser)
+    parser.add_argument(
+        "--shards",
+        type=int,
+        metavar="N",
+        help="merge the N-shard builds and ignore other I-of-M directories left in --shard-dir",
+    )
+    parser.add_argument(
+        "--verify-static-hash",
+        action="store_true",
+        help="when syncing static files, compare BLAKE2 hashes as well as size and mtime",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="compress in N worker processes (0 means one per CPU)")
+    add_gzip_arguments(parser)
+    add_site_index_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.shards is not None and args.shards < 1:
+        parser.error(f"invalid --shards {args.shards}: expected at least 1")
+    return parser, args
+
+
+def add_shard_dir_argument(parser):
+    parser.add_argument(
+        "--shard-dir",
+        default=default_shard_dir,
+        metavar="DIR",
+        help=f"directory holding one output directory and manifest per shard (default {default_shard_dir})",
+    )
+
+
+def add_gzip_arguments(parser):
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write precompressed .gz sidecars next to changed text outputs",
+    )
+    parser.add_argument("--gzip-level", type=int, default=DEFAULT_LEVEL, help="gzip compression level (1-9)")
+    parser.add_argument(
+        "--gzip-min-bytes",
+        type=int,
+        default=DEFAULT_MIN_BYTES,
+        metavar="N",
+        help="only compress outputs of at least N bytes",
+    )
+    parser.add_argument(
+        "--gzip-types",
+        default=",".join(extension[1:] for extension in DEFAULT_EXTENSIONS),
+        metavar="EXTS",
+        help="comma-separated file extensions to compress",
+    )
+
+
+def add_site_index_arguments(parser):
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="absolute site URL (e.g. https://example.com); when set, write sitemap.xml and atom.xml",
+    )
+    parser.add_argument(
+        "--feed-section",
+        default=default_feed_section,
+        metavar="DIR",
+        help=f"content directory whose pages go into atom.xml (default {default_feed_section})",
+    )
+    parser.add_argument("--feed-title", default="Blog", help="title of the Atom feed")
+    parser.add_argument("--feed-author", default="Site author", help="author named in the Atom feed")
+    parser.add_argument("--feed-entries", type=int, default=FEED_ENTRIES, metavar="N", help="newest pages in the feed")
+
+
+def print_affected(paths):
+    manifest = BuildManifest.load(manifest_path)
+    if manifest is None:
+        raise ValueError(f"no usable build manifest at {manifest_path}, run a build first")
+    graph = DependencyGraph.from_manifest(manifest)
+    for output in graph.affected(paths):
+        print(output)
+
+
+def write_site_index(site_index, args, basepath, manifest, output_writer):
+    output_writer.write_text(sitemap_path, site_index.render_sitemap(args.site_url, basepath))
+    manifest.record_generated("sitemap", sitemap_path)
+    feed_url = absolute_url(args.site_url, basepath, os.path.relpath(feed_path, dir_path_public))
+    feed = site_index.render_feed(
+        args.site_url, basepath, args.feed_section, feed_url, args.feed_title, args.feed_author, args.feed_entries
+    )
+    output_writer.write_text(feed_path, feed)
+    manifest.record_generated("feed", feed_path)
+    return [sitemap_path, feed_path]
+
+
+def remove_stale_outputs(manifest, output_dir, full_build, gzip):
+    removed_paths = manifest.prune(output_dir)
+    if full_build:
+        removed_paths += manifest.remove_unrecorded(output_dir, (SIDECAR_SUFFIX,) if gzip else ())
+    for removed_path in removed_paths:
+        print(f" - removed stale output {removed_path}")
+
+
+def sidecar_compressor(args, jobs):
+    extensions = ["." + extension.strip().lstrip(".") for extension in args.gzip_types.split(",") if extension.strip()]
+    return SidecarCompressor(args.gzip_level, args.gzip_min_bytes, extensions, jobs)
+
+
+def compress_outputs(args, output_dir, jobs):
+    compressor = sidecar_compressor(args, jobs)
+    with stage("compress"):
+        compressor.run(output_dir)
+    print(compressor.summary())
+
+
+def merge(argv):
+    parser, args = parse_merge_args(argv)
+    jobs = args.jobs or os.cpu_count() or 1
+    manifest = BuildManifest(manifest_path)
+    output_writer = OutputWriter()
+    activate_output_writer(output_writer)
+
+    try:
+        site_index, basepath = merge_shards(
+            args.shard_dir, dir_path_static, dir_path_public, manifest, args.verify_static_hash, args.shards
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if args.site_url:
+        write_site_index(site_index, args, basepath, manifest, output_writer)
+    remove_stale_outputs(manifest, dir_path_public, True, args.gzip)
+    if args.gzip:
+        compress_outputs(args, dir_path_public, jobs)
+    manifest.save()
+    print(output_writer.summary())
 
 
 def main():
-    basepath = default_basepath
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    if sys.argv[1:2] == ["merge"]:
+        merge(sys.argv[2:])
+        return
+    parser, args = parse_args()
+    if args.affected_by:
+        try:
+            print_affected(args.affected_by)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    basepath = args.basepath
+    jobs = args.jobs or os.cpu_count() or 1
+    pipeline = None
+    if args.pipeline:
+        pipeline = PipelineConfig(args.read_ahead, args.write_behind, args.io_workers)
+
+    output_dir = dir_path_public
+    build_manifest_path = manifest_path
+    if args.shard is not None:
+        shard_dir = args.shard.dir_path(args.shard_dir)
+        output_dir = os.path.join(shard_dir, SHARD_OUTPUT)
+        build_manifest_path = os.path.join(shard_dir, SHARD_MANIFEST)
+        print(f"Building shard {args.shard.index} of {args.shard.count} into {output_dir}...")
 
-    print("Deleting docs directory...")
-    if os.path.exists(dir_path_public):
-        shutil.rmtree(dir_path_public)
+    manifest = None
+    if args.incremental:
+        manifest = BuildManifest.load(build_manifest_path)
+        if manifest is None:
+            print("No usable build manifest, doing a full build...")
 
-    print("Copying static files to docs directory...")
-    copy_files_recursive(dir_path_static, dir_path_public)
+    full_build = manifest is None
+    if full_build:
+        print("Rebuilding every page, rewriting only outputs that changed...")
+        manifest = BuildManifest(build_manifest_path)
+    if args.shard is not None:
+        manifest.shard = args.shard.to_data(output_dir)
+
+    document_cache = None
+    if not args.no_document_cache and args.render_backend == "tree":
+        document_cache = DocumentCache(document_cache_path, max_bytes=args.document_cache_size * 1024 * 1024)
+    activate_document_cache(document_cache)
+
+    fragment_cache = None
+    if not args.no_fragment_cache and args.render_backend == "tree":
+        fragment_cache = FragmentCache(fragment_cache_path, args.fragment_cache_size * 1024 * 1024)
+    activate_fragment_cache(fragment_cache)
+
+    output_writer = OutputWriter()
+    activate_output_writer(output_writer)
+
+    build_profiler = BuildProfiler() if args.profile else None
+    activate(build_profiler)
+    cprofile = cProfile.Profile() if args.cprofile else None
+    if cprofile is not None:
+        cprofile.enable()
+    start = time.perf_counter()
+
+    if args.shard is None:
+        print("Copying static files to docs directory...")
+        with stage("copy_static"):
+            copy_files_recursive(dir_path_static, output_dir, manifest, args.verify_static_hash)
 
     print("Generating content...")
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public, basepath)
+    site_index = generate_pages_recursive(
+        dir_path_content,
+        template_path,
+        output_dir,
+        basepath,
+        manifest,
+        jobs,
+        pipeline,
+        args.render_backend,
+        args.shard,
+    )
+    if args.site_url:
+        write_site_index(site_index, args, basepath, manifest, output_writer)
+
+    remove_stale_outputs(manifest, output_dir, full_build, args.gzip)
+    if args.gzip:
+        compress_outputs(args, output_dir, jobs)
+    manifest.save()
+    print(output_writer.summary())
+    if document_cache is not None:
+        document_cache.evict()
+        print(document_cache.summary())
+    if fragment_cache is not None:
+        fragment_cache.flush()
+        print(fragment_cache.summary())
+
+    wall = time.perf_counter() - start
+    if cprofile is not None:
+        cprofile.disable()
+        cprofile.dump_stats(args.cprofile)
+        print(f"Wrote cProfile stats to {args.cprofile}")
+    if build_profiler is not None:
+        activate(None)
+        report = build_profiler.write_report(args.profile_output, args.profile_top, wall)
+        print_summary(report)
+        print(f"Wrote build profile to {args.profile_output}")
+
+    if args.watch:
+        compressor = sidecar_compressor(args, jobs) if args.gzip else None
+        site_index_writer = None
+        if args.site_url:
+            site_index_writer = partial(
+                write_site_index, args=args, basepath=basepath, manifest=manifest, output_writer=output_writer
+            )
+        rebuilder = SiteRebuilder(
+            dir_path_content,
+            dir_path_static,
+            template_path,
+            dir_path_public,
+            basepath,
+            manifest,
+            args.render_backend,
+            compressor,
+            site_index_writer,
+        )
+        watch(rebuilder, args.port)
 
 
-main()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+
+from renderers import active as active_renderers
+
+
+MANIFEST_VERSION = 3
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def site_key(site):
+    if site is None:
+        return None
+    return hashlib.sha256(json.dumps(site, sort_keys=True).encode()).hexdigest()
+
+
+PARSER_MODULES = (
+    "htmlnode.py",
+    "inline_markdown.py",
+    "inline_parser.py",
+    "markdown_blocks.py",
+    "renderers.py",
+    "textnode.py",
+)
+
+
+def generator_version():
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    filenames = [
+        filename
+        for filename in sorted(os.listdir(src_dir))
+        if filename.endswith(".py") and not filename.startswith("test_")
+    ]
+    return hash_sources(src_dir, filenames)
+
+
+def parser_version():
+    sources = hash_sources(os.path.dirname(os.path.abspath(__file__)), PARSER_MODULES)
+    return f"{sources}:{active_renderers().version}"
+
+
+def hash_sources(src_dir, filenames):
+    digest = hashlib.sha256()
+    for filename in filenames:
+        digest.update(filename.encode())
+        with open(os.path.join(src_dir, filename), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path, generator=None):
+        self.path = path
+        self.generator = generator or generator_version()
+        self.pages = {}
+        self.static = {}
+        self.generated = {}
+        self.shard = None
+        self.seen = set()
+        self.hashes = {}
+
+    @classmethod
+    def load(cls, path, generator=None):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        manifest = cls(path, generator)
+        manifest.pages = data.get("pages", {})
+        manifest.static = data.get("static", {})
+        manifest.generated = data.get("generated", {})
+        manifest.shard = data.get("shard")
+        return manifest
+
+    def save(self):
+        dir_path = os.path.dirname(self.path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "pages": self.pages,
+            "static": self.static,
+            "generated": self.generated,
+        }
+        if self.shard is not None:
+            data["shard"] = self.shard
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def input_hash(self, path):
+        key = os.path.normpath(path)
+        if key not in self.hashes:
+            self.hashes[key] = hash_file(path)
+        return self.hashes[key]
+
+    def forget_input(self, path):
+        self.hashes.pop(os.path.normpath(path), None)
+
+    def page_is_current(self, from_path, template_path, dest_path, basepath, site=None):
+        key = os.path.normpath(from_path)
+        self.seen.add(key)
+        entry = self.pages.get(key)
+        if entry is None:
+            return False
+        return (
+            entry["output"] == os.path.normpath(dest_path)
+            and os.path.normpath(template_path) in entry["inputs"]
+            and entry["basepath"] == basepath
+            and entry.get("site") == site_key(site)
+            and entry["generator"] == self.generator
+            and self.inputs_are_current(entry["inputs"])
+            and os.path.isfile(dest_path)
+        )
+
+    def inputs_are_current(self, inputs):
+        for path, digest in inputs.items():
+            try:
+                if self.input_hash(path) != digest:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def page_index(self, from_path):
+        entry = self.pages.get(os.path.normpath(from_path))
+        if entry is None:
+            return None
+        return entry.get("index")
+
+    def record_page(self, from_path, template_path, dest_path, basepath, partials=(), index=None, site=None):
+        key = os.path.normpath(from_path)
+        self.seen.add(key)
+        self.discard_moved_output(self.pages.get(key), dest_path)
+        inputs = {}
+        for path in (from_path, template_path, *partials):
+            inputs[os.path.normpath(path)] = self.input_hash(path)
+        self.pages[key] = {
+            "output": os.path.normpath(dest_path),
+            "inputs": inputs,
+            "basepath": basepath,
+            "generator": self.generator,
+        }
+        if index is not None:
+            self.pages[key]["index"] = index
+        if site is not None:
+            self.pages[key]["site"] = site_key(site)
+
+    def adopt_page(self, from_path, entry, dest_path):
+        key = os.path.normpath(from_path)
+        self.seen.add(key)
+        self.discard_moved_output(self.pages.get(key), dest_path)
+        self.pages[key] = {**entry, "output": os.path.normpath(dest_path)}
+
+    def record_static(self, from_path, dest_path):
+        key = os.path.normpath(from_path)
+        self.seen.add(key)
+        self.discard_moved_output(self.static.get(key), dest_path)
+        self.static[key] = {"output": os.path.normpath(dest_path)}
+
+    def record_generated(self, name, dest_path):
+        self.seen.add(name)
+        self.discard_moved_output(self.generated.get(name), dest_path)
+        self.generated[name] = {"output": os.path.normpath(dest_path)}
+
+    def discard_moved_output(self, entry, dest_path):
+        if entry is None or entry["output"] == os.path.normpath(dest_path):
+            return
+        if os.path.isfile(entry["output"]):
+            os.remove(entry["output"])
+
+    def discard(self, from_path, dest_root):
+        key = os.path.normpath(from_path)
+        self.seen.discard(key)
+        self.forget_input(from_path)
+        for entries in (self.pages, self.static):
+            entry = entries.pop(key, None)
+            if entry is not None and os.path.isfile(entry["output"]):
+                os.remove(entry["output"])
+                remove_empty_dirs(os.path.dirname(entry["output"]), dest_root)
+                return entry["output"]
+        return None
+
+    def prune(self, dest_root):
+        removed = []
+        for entries in (self.pages, self.static, self.generated):
+            for key in list(entries):
+                if key in self.seen:
+                    continue
+                output = entries.pop(key)["output"]
+                if os.path.isfile(output):
+                    os.remove(output)
+                    removed.append(output)
+                    remove_empty_dirs(os.path.dirname(output), dest_root)
+        return removed
+
+    def outputs(self):
+        return {
+            entry["output"]
+            for entries in (self.pages, self.static, self.generated)
+            for entry in entries.values()
+        }
+
+    def remove_unrecorded(self, dest_root, sidecar_suffixes=()):
+        outputs = self.outputs()
+        removed = []
+        for root, _, filenames in os.walk(dest_root, topdown=False):
+            for filename in filenames:
+                path = os.path.normpath(os.path.join(root, filename))
+                if path in outputs:
+                    continue
+                if any(path.endswith(suffix) and path[:-len(suffix)] in outputs for suffix in sidecar_suffixes):
+                    continue
+                os.remove(path)
+                removed.append(path)
+            if os.path.normpath(root) != os.path.normpath(dest_root) and not os.listdir(root):
+                os.rmdir(root)
+        return sorted(removed)
+
+
+def remove_empty_dirs(dir_path, stop_path):
+    stop_path = os.path.normpath(stop_path)
+    dir_path = os.path.normpath(dir_path)
+    while dir_path != stop_path and dir_path.startswith(stop_path + os.sep):
+        if os.listdir(dir_path):
+            return
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
@@ -1,9 +1,21 @@
+import re
+
 from enum import Enum
 
 
-from htmlnode import ParentNode
+from doccache import active as active_document_cache
+
+from fragmentcache import active as active_fragment_cache
+
+from htmlnode import ROOT_MARKER, ParentNode, RenderedNode
+
+from inline_parser import text_to_html_nodes
+
+from profiler import stage
 
-from inline_markdown import text_to_textnodes
+from renderers import DEFAULT_RENDERERS, active as active_renderers
+
+from siteindex import summary_text
 
 from textnode import text_node_to_html_node, TextNode, TextType
 
@@ -23,140 +35,296 @@ class BlockType(Enum):
     ULIST = "unordered_list"
 
 
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+FENCE_PATTERN = re.compile(r"^(`{3,})[^`]*$")
+
+
 def markdown_to_blocks(markdown):
 
-    blocks = markdown.split("\n\n")
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown.split("\n"))]
+
+
+
+def scan_blocks(lines):
+
+    block = []
+
+    block_type = None
+
+    fence = 0
+
+    for line in lines:
+
+        if fence:
+
+            block.append(line)
+
+            if is_closing_fence(line, fence):
+
+                block[-1] = line.rstrip()
+
+                yield BlockType.CODE, block
+
+                block = []
+
+                fence = 0
+
+            continue
+
+        if not line or line.isspace():
+
+            if block:
+
+                yield finish_block(block_type, block)
+
+                block = []
+
+            continue
+
+        opening = FENCE_PATTERN.match(line.lstrip())
+
+        if opening is not None:
+
+            if block:
 
-    filtered_blocks = []
+                yield finish_block(block_type, block)
 
-    for block in blocks:
+            fence = len(opening.group(1))
 
-        if block == "":
+            block = [line.lstrip()]
 
             continue
 
-        block = block.strip()
+        if not block:
 
-        filtered_blocks.append(block)
+            line = line.lstrip()
+
+            block_type = first_line_type(line)
+
+        elif not line_continues(block_type, line, len(block) + 1):
+
+            block_type = BlockType.PARAGRAPH
+
+        block.append(line)
+
+    if fence:
+
+        yield BlockType.CODE, block
+
+    elif block:
+
+        yield finish_block(block_type, block)
+
+
+
+def finish_block(block_type, block):
+
+    block[-1] = block[-1].rstrip()
+
+    if len(block) == 1:
+
+        block_type = first_line_type(block[0])
+
+    elif not line_continues(block_type, block[-1], len(block)):
+
+        block_type = BlockType.PARAGRAPH
+
+    return block_type, block
+
+
+
+def first_line_type(line):
+
+    return active_renderers().block_type_of(line, BlockType.PARAGRAPH)
+
+
+
+def line_continues(block_type, line, number):
+
+    if block_type == BlockType.OLIST:
+
+        return line.startswith(f"{number}. ")
+
+    continuation = active_renderers().continuations.get(block_type)
+
+    return continuation is None or line.startswith(continuation)
+
+
+
+def is_closing_fence(line, fence):
+
+    line = line.strip()
+
+    return len(line) >= fence and line == "`" * len(line)
 
-    return filtered_blocks
 
 
 def block_to_block_type(block):
 
     lines = block.split("\n")
 
+    block_type = first_line_type(lines[0])
 
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+    if block_type == BlockType.HEADING:
 
-        return BlockType.HEADING
+        return block_type
 
     if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
 
         return BlockType.CODE
 
-    if block.startswith(">"):
+    for number in range(2, len(lines) + 1):
 
-        for line in lines:
+        if not line_continues(block_type, lines[number - 1], number):
 
-            if not line.startswith(">"):
+            return BlockType.PARAGRAPH
 
-                return BlockType.PARAGRAPH
+    return block_type
 
-        return BlockType.QUOTE
 
-    if block.startswith("- "):
 
-        for line in lines:
+def markdown_to_html_node(markdown):
 
-            if not line.startswith("- "):
+    cache = active_document_cache()
 
-                return BlockType.PARAGRAPH
+    if cache is None:
 
-        return BlockType.ULIST
+        return parse_markdown(markdown)
 
-    if block.startswith("1. "):
+    with stage("document_cache"):
 
-        i = 1
+        key = cache.key(markdown)
 
-        for line in lines:
+        html_node = cache.load(key)
 
-            if not line.startswith(f"{i}. "):
+    if html_node is not None:
 
-                return BlockType.PARAGRAPH
+        return html_node
 
-            i += 1
+    html_node = parse_markdown(markdown)
 
-        return BlockType.OLIST
+    with stage("document_cache"):
 
-    return BlockType.PARAGRAPH
+        cache.store(key, html_node)
 
+    return html_node
 
-def markdown_to_html_node(markdown):
 
-    blocks = markdown_to_blocks(markdown)
+
+def parse_markdown(markdown):
+
+    with stage("block_split"):
+
+        blocks = list(scan_blocks(markdown.split("\n")))
 
     children = []
 
-    for block in blocks:
+    with stage("tree_build"):
+
+        cache = active_fragment_cache()
+
+        for block_type, lines in blocks:
+
+            if cache is None:
+
+                html_node = lines_to_html_node(block_type, lines)
 
-        html_node = block_to_html_node(block)
+            else:
 
-        children.append(html_node)
+                html_node = cached_lines_to_html_node(cache, block_type, lines)
+
+            children.append(html_node)
 
     return ParentNode("div", children, None)
 
 
-def block_to_html_node(block):
 
-    block_type = block_to_block_type(block)
+class MarkdownStream:
 
-    if block_type == BlockType.PARAGRAPH:
+    def __init__(self, lines, on_node=None):
 
-        return paragraph_to_html_node(block)
+        self.lines = lines
 
-    if block_type == BlockType.HEADING:
+        self.on_node = on_node
 
-        return heading_to_html_node(block)
 
-    if block_type == BlockType.CODE:
+    def iter_html(self, basepath="/"):
 
-        return code_to_html_node(block)
+        yield "<div>"
 
-    if block_type == BlockType.OLIST:
+        cache = active_fragment_cache()
 
-        return olist_to_html_node(block)
+        for block_type, lines in scan_blocks(self.lines):
 
-    if block_type == BlockType.ULIST:
+            if cache is None:
 
-        return ulist_to_html_node(block)
+                html_node = lines_to_html_node(block_type, lines)
 
-    if block_type == BlockType.QUOTE:
+            else:
 
-        return quote_to_html_node(block)
+                html_node = cached_lines_to_html_node(cache, block_type, lines)
 
-    raise ValueError("invalid block type")
+            if self.on_node is not None:
 
+                self.on_node(html_node)
 
-def text_to_children(text):
+            yield from html_node.iter_html(basepath)
 
-    text_nodes = text_to_textnodes(text)
+        yield "</div>"
 
-    children = []
 
-    for text_node in text_nodes:
 
-        html_node = text_node_to_html_node(text_node)
+def cached_lines_to_html_node(cache, block_type, lines):
 
-        children.append(html_node)
+    text = "\n".join(lines)
 
-    return children
+    if len(text) < cache.min_block_bytes or "\0" in text:
 
+        return lines_to_html_node(block_type, lines)
 
+    key = cache.key(block_type.value, text)
 
-def paragraph_to_html_node(block):
+    rendered = cache.get(key)
 
-    lines = block.split("\n")
+    if rendered is not None:
+
+        tag, html, summary = rendered
+
+        return RenderedNode(tag, html, summary)
+
+    html_node = lines_to_html_node(block_type, lines)
+
+    cache.put(key, html_node.tag, html_node.to_html(ROOT_MARKER), summary_text(html_node))
+
+    return html_node
+
+
+
+def block_to_html_node(block):
+
+    return lines_to_html_node(block_to_block_type(block), block.split("\n"))
+
+
+
+def lines_to_html_node(block_type, lines):
+
+    return active_renderers().render_block(block_type, lines)
+
+
+
+def text_to_children(text):
+
+    with stage("inline_parse"):
+
+        return text_to_html_nodes(text)
+
+
+
+
+def paragraph_to_html_node(lines):
 
     paragraph = " ".join(lines)
 
@@ -166,7 +334,18 @@ def paragraph_to_html_node(block):
 
 
 
-def heading_to_html_node(block):
+
+def heading_to_html_node(lines):
+
+    tag, text = heading_parts(lines)
+
+    return ParentNode(tag, text_to_children(text))
+
+
+
+def heading_parts(lines):
+
+    block = "\n".join(lines)
 
     level = 0
 
@@ -186,21 +365,17 @@ def heading_to_html_node(block):
 
     text = block[level + 1 :]
 
-    children = text_to_children(text)
+    if level <= len(HEADING_TAGS):
 
-    return ParentNode(f"h{level}", children)
+        return HEADING_TAGS[level - 1], text
 
+    return f"h{level}", text
 
 
-def code_to_html_node(block):
 
-    if not block.startswith("```") or not block.endswith("```"):
-
-        raise ValueError("invalid code block")
+def code_to_html_node(lines):
 
-    text = block[4:-3]
-
-    raw_text_node = TextNode(text, TextType.TEXT)
+    raw_text_node = TextNode(code_text(lines), TextType.TEXT)
 
     child = text_node_to_html_node(raw_text_node)
 
@@ -210,13 +385,29 @@ def code_to_html_node(block):
 
 
 
-def olist_to_html_node(block):
+def code_text(lines):
+
+    if not lines[0].startswith("```"):
+
+        raise ValueError("invalid code block")
 
-    items = block.split("\n")
+    fence = len(lines[0]) - len(lines[0].lstrip("`"))
+
+    body = lines[1:]
+
+    if body and is_closing_fence(body[-1], fence):
+
+        body.pop()
+
+    return "".join([line + "\n" for line in body])
+
+
+
+def olist_to_html_node(lines):
 
     html_items = []
 
-    for item in items:
+    for item in lines:
 
         text = item[3:]
 
@@ -228,13 +419,12 @@ def olist_to_html_node(block):
 
 
 
-def ulist_to_html_node(block):
 
-    items = block.split("\n")
+def ulist_to_html_node(lines):
 
     html_items = []
 
-    for item in items:
+    for item in lines:
 
         text = item[2:]
 
@@ -246,9 +436,16 @@ def ulist_to_html_node(block):
 
 
 
-def quote_to_html_node(block):
 
-    lines = block.split("\n")
+def quote_to_html_node(lines):
+
+    children = text_to_children(quote_text(lines))
+
+    return ParentNode("blockquote", children)
+
+
+
+def quote_text(lines):
 
     new_lines = []
 
@@ -260,11 +457,18 @@ def quote_to_html_node(block):
 
         new_lines.append(line.lstrip(">").strip())
 
-    content = " ".join(new_lines)
+    return " ".join(new_lines)
+
+
+
+DEFAULT_RENDERERS.register_block(BlockType.PARAGRAPH, paragraph_to_html_node)
+
+DEFAULT_RENDERERS.register_block(BlockType.HEADING, heading_to_html_node, HEADING_PREFIXES)
 
-    children = text_to_children(content)
+DEFAULT_RENDERERS.register_block(BlockType.CODE, code_to_html_node)
 
-    return ParentNode("blockquote", children) 
+DEFAULT_RENDERERS.register_block(BlockType.QUOTE, quote_to_html_node, (">",), ">")
 
+DEFAULT_RENDERERS.register_block(BlockType.ULIST, ulist_to_html_node, ("- ",), "- ")
 
-    
\ No newline at end of file
+DEFAULT_RENDERERS.register_block(BlockType.OLIST, olist_to_html_node, ("1. ",))
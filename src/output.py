@@ -0,0 +1,130 @@
+import hashlib
+import os
+import shutil
+import threading
+
+from copystatic import blake2_file
+
+
+class OutputWriter:
+    def __init__(self):
+        self.written = 0
+        self.unchanged = 0
+        self.lock = threading.Lock()
+
+    def write_text(self, path, text):
+        data = text.encode("utf-8")
+        if matches_file(path, len(data), lambda: hashlib.blake2b(data).hexdigest()):
+            self.count(False)
+            return False
+        tmp_path = temp_path_for(path)
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            remove_quietly(tmp_path)
+            raise
+        self.count(True)
+        return True
+
+    def open(self, path):
+        return AtomicOutput(self, path)
+
+    def copy(self, from_path, path):
+        tmp_path = temp_path_for(path)
+        try:
+            shutil.copy2(from_path, tmp_path)
+            return self.commit(tmp_path, path)
+        except BaseException:
+            remove_quietly(tmp_path)
+            raise
+
+    def commit(self, tmp_path, path):
+        size = os.path.getsize(tmp_path)
+        if matches_file(path, size, lambda: blake2_file(tmp_path)):
+            os.remove(tmp_path)
+            self.count(False)
+            return False
+        os.replace(tmp_path, path)
+        self.count(True)
+        return True
+
+    def count(self, written):
+        with self.lock:
+            if written:
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def stats(self):
+        return {"written": self.written, "unchanged": self.unchanged}
+
+    def merge_stats(self, stats):
+        with self.lock:
+            self.written += stats["written"]
+            self.unchanged += stats["unchanged"]
+
+    def summary(self):
+        return f"Output: {self.written} written, {self.unchanged} unchanged"
+
+
+class AtomicOutput:
+    def __init__(self, writer, path):
+        self.writer = writer
+        self.path = path
+        self.tmp_path = temp_path_for(path)
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+        return self.file
+
+    def __exit__(self, exc_type, exc, tb):
+        self.file.close()
+        if exc_type is not None:
+            remove_quietly(self.tmp_path)
+            return False
+        try:
+            self.writer.commit(self.tmp_path, self.path)
+        except BaseException:
+            remove_quietly(self.tmp_path)
+            raise
+        return False
+
+
+def matches_file(path, size, digest):
+    try:
+        if os.path.getsize(path) != size:
+            return False
+        return blake2_file(path) == digest()
+    except OSError:
+        return False
+
+
+def temp_path_for(path):
+    dir_path, filename = os.path.split(os.fspath(path))
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    return os.path.join(dir_path, f".{filename}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_active = OutputWriter()
+
+
+def active():
+    return _active
+
+
+def activate(writer):
+    global _active
+    previous = _active
+    _active = writer
+    return previous
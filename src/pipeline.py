@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from output import active as active_output_writer
+from template import load_template
+
+
+DEFAULT_READ_AHEAD = 64
+DEFAULT_WRITE_BEHIND = 64
+DEFAULT_IO_WORKERS = 8
+
+
+class PipelineConfig:
+    def __init__(self, read_ahead=DEFAULT_READ_AHEAD, write_behind=DEFAULT_WRITE_BEHIND, io_workers=DEFAULT_IO_WORKERS):
+        if read_ahead < 1 or write_behind < 1 or io_workers < 1:
+            raise ValueError("pipeline queue depths and worker counts must be at least 1")
+        self.read_ahead = read_ahead
+        self.write_behind = write_behind
+        self.io_workers = io_workers
+
+    def __repr__(self):
+        return f"PipelineConfig({self.read_ahead}, {self.write_behind}, {self.io_workers})"
+
+
+def generate_pages_pipelined(pages, template_path, basepath, render, config=None):
+    return asyncio.run(run_pipeline(pages, template_path, basepath, render, config or PipelineConfig()))
+
+
+async def run_pipeline(pages, template_path, basepath, render, config):
+    template = load_template(template_path, basepath)
+    read_queue = asyncio.Queue(config.read_ahead)
+    write_queue = asyncio.Queue(config.write_behind)
+    pending = iter(pages)
+    page_infos = {}
+    with ThreadPoolExecutor(config.io_workers) as io_executor, ThreadPoolExecutor(1) as render_executor:
+        tasks = [
+            asyncio.create_task(read_stage(pending, read_queue, io_executor))
+            for _ in range(config.io_workers)
+        ]
+        tasks.append(asyncio.create_task(
+            render_stage(
+                read_queue, write_queue, render, template, template_path, render_executor, config.io_workers, page_infos
+            )
+        ))
+        tasks.extend(
+            asyncio.create_task(write_stage(write_queue, io_executor))
+            for _ in range(config.io_workers)
+        )
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    return page_infos
+
+
+async def read_stage(pending, read_queue, io_executor):
+    loop = asyncio.get_running_loop()
+    for from_path, dest_path in pending:
+        try:
+            markdown_content = await loop.run_in_executor(io_executor, read_text, from_path)
+        except OSError as e:
+            raise ValueError(f"failed to generate {from_path}: {e}") from e
+        await read_queue.put((from_path, dest_path, markdown_content))
+    await read_queue.put(None)
+
+
+async def render_stage(
+    read_queue, write_queue, render, template, template_path, render_executor, io_workers, page_infos
+):
+    loop = asyncio.get_running_loop()
+    readers = io_workers
+    while readers:
+        item = await read_queue.get()
+        if item is None:
+            readers -= 1
+            continue
+        from_path, dest_path, markdown_content = item
+        print(f" * {from_path} {template_path} -> {dest_path}")
+        try:
+            page, info = await loop.run_in_executor(render_executor, render, markdown_content, template)
+        except Exception as e:
+            raise ValueError(f"failed to generate {from_path}: {e}") from e
+        page_infos[from_path] = info
+        await write_queue.put((dest_path, page))
+    for _ in range(io_workers):
+        await write_queue.put(None)
+
+
+async def write_stage(write_queue, io_executor):
+    loop = asyncio.get_running_loop()
+    output_writer = active_output_writer()
+    while True:
+        item = await write_queue.get()
+        if item is None:
+            return
+        await loop.run_in_executor(io_executor, output_writer.write_text, *item)
+
+
+def read_text(path):
+    with open(path, "r") as f:
+        return f.read()
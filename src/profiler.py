@@ -0,0 +1,145 @@
+import json
+import os
+import time
+from contextlib import nullcontext
+
+
+_active = None
+_null_stage = nullcontext()
+
+
+def stage(name):
+    if _active is None:
+        return _null_stage
+    return _active.stage(name)
+
+
+def active():
+    return _active
+
+
+def activate(profiler):
+    global _active
+    previous = _active
+    _active = profiler
+    return previous
+
+
+class StageTimer:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.stack.append([self.name, time.perf_counter(), time.process_time(), 0.0, 0.0])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        name, start_wall, start_cpu, child_wall, child_cpu = self.profiler.stack.pop()
+        wall = time.perf_counter() - start_wall
+        cpu = time.process_time() - start_cpu
+        self.profiler.add_stage(name, wall - child_wall, cpu - child_cpu)
+        if self.profiler.stack:
+            self.profiler.stack[-1][3] += wall
+            self.profiler.stack[-1][4] += cpu
+        return False
+
+
+class PageTimer:
+    def __init__(self, profiler, source):
+        self.profiler = profiler
+        self.record = {"source": source, "wall": 0.0, "cpu": 0.0, "nodes": 0, "bytes": 0, "stages": {}}
+
+    def __enter__(self):
+        self.profiler.page = self.record
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["wall"] = time.perf_counter() - self.start_wall
+        self.record["cpu"] = time.process_time() - self.start_cpu
+        self.profiler.pages.append(self.record)
+        self.profiler.page = None
+        return False
+
+
+class BuildProfiler:
+    def __init__(self):
+        self.stages = {}
+        self.pages = []
+        self.page = None
+        self.stack = []
+
+    def stage(self, name):
+        return StageTimer(self, name)
+
+    def page_timer(self, source):
+        return PageTimer(self, source)
+
+    def add_stage(self, name, wall, cpu):
+        totals = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+        totals["wall"] += wall
+        totals["cpu"] += cpu
+        totals["calls"] += 1
+        if self.page is not None:
+            self.page["stages"][name] = self.page["stages"].get(name, 0.0) + wall
+
+    def count(self, nodes=0, bytes_written=0):
+        if self.page is not None:
+            self.page["nodes"] += nodes
+            self.page["bytes"] += bytes_written
+
+    def merge(self, data):
+        for name, totals in data["stages"].items():
+            merged = self.stages.setdefault(name, {"wall": 0.0, "cpu": 0.0, "calls": 0})
+            for key in merged:
+                merged[key] += totals[key]
+        self.pages.extend(data["pages"])
+
+    def to_data(self):
+        return {"stages": self.stages, "pages": self.pages}
+
+    def report(self, top=10, wall=None):
+        slowest = sorted(self.pages, key=lambda page: page["wall"], reverse=True)[:top]
+        return {
+            "wall": wall,
+            "pages": len(self.pages),
+            "nodes": sum(page["nodes"] for page in self.pages),
+            "bytes_written": sum(page["bytes"] for page in self.pages),
+            "stages": self.stages,
+            "slowest_pages": slowest,
+        }
+
+    def write_report(self, path, top=10, wall=None):
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        report = self.report(top, wall)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
+
+
+def print_summary(report):
+    stage_wall = sum(totals["wall"] for totals in report["stages"].values()) or 1.0
+    print(f"Profiled {report['pages']} pages, {report['nodes']} nodes, {report['bytes_written']} bytes written")
+    print(f"{'stage':<22} {'wall s':>10} {'cpu s':>10} {'calls':>8} {'share':>7}")
+    for name, totals in sorted(report["stages"].items(), key=lambda item: item[1]["wall"], reverse=True):
+        share = totals["wall"] / stage_wall
+        print(f"{name:<22} {totals['wall']:>10.4f} {totals['cpu']:>10.4f} {totals['calls']:>8} {share:>7.1%}")
+    if report["slowest_pages"]:
+        print("Slowest pages:")
+        for page in report["slowest_pages"]:
+            print(f"  {page['wall'] * 1000:9.2f} ms  {page['nodes']:>7} nodes  {page['source']}")
@@ -0,0 +1,99 @@
+import hashlib
+
+from profiler import stage
+
+
+class CustomBlockType:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __repr__(self):
+        return f"CustomBlockType({self.value})"
+
+
+class RendererRegistry:
+    def __init__(self):
+        self.block_handlers = {}
+        self.inline_handlers = {}
+        self.block_starts = {}
+        self.continuations = {}
+        self.stage_names = {}
+        self.registrations = []
+        self.version = ""
+
+    def copy(self):
+        registry = RendererRegistry()
+        registry.block_handlers = dict(self.block_handlers)
+        registry.inline_handlers = dict(self.inline_handlers)
+        registry.block_starts = {char: list(starts) for char, starts in self.block_starts.items()}
+        registry.continuations = dict(self.continuations)
+        registry.stage_names = dict(self.stage_names)
+        registry.registrations = list(self.registrations)
+        registry.version = self.version
+        return registry
+
+    def register_block(self, block_type, handler, prefixes=(), continuation=None):
+        if isinstance(block_type, str):
+            block_type = CustomBlockType(block_type)
+        self.block_handlers[block_type] = handler
+        self.stage_names[block_type] = "block:" + block_type.value
+        for prefix in prefixes:
+            if prefix == "":
+                raise ValueError(f"empty start prefix for block type {block_type.value}")
+            starts = [start for start in self.block_starts.get(prefix[0], ()) if start[0] != prefix]
+            starts.append((prefix, block_type))
+            starts.sort(key=lambda start: len(start[0]), reverse=True)
+            self.block_starts[prefix[0]] = starts
+        if continuation is not None:
+            self.continuations[block_type] = continuation
+        self.record("block", block_type.value, handler, prefixes, continuation)
+        return block_type
+
+    def register_inline(self, text_type, handler):
+        self.inline_handlers[text_type] = handler
+        self.stage_names[text_type] = "inline:" + text_type.value
+        self.record("inline", text_type.value, handler)
+
+    def record(self, kind, name, handler, *options):
+        self.registrations.append(
+            f"{kind}:{name}:{handler.__module__}.{handler.__qualname__}:{options!r}"
+        )
+        self.version = hashlib.sha256("\n".join(self.registrations).encode()).hexdigest()[:16]
+
+    def block_type_of(self, line, default):
+        for prefix, block_type in self.block_starts.get(line[:1], ()):
+            if line.startswith(prefix):
+                return block_type
+        return default
+
+    def render_block(self, block_type, lines):
+        handler = self.block_handlers.get(block_type)
+        if handler is None:
+            raise ValueError("invalid block type")
+        with stage(self.stage_names[block_type]):
+            return handler(lines)
+
+    def render_inline(self, text_type, children, url=None):
+        handler = self.inline_handlers.get(text_type)
+        if handler is None:
+            raise ValueError(f"invalid text type: {text_type}")
+        with stage(self.stage_names[text_type]):
+            return handler(children, url)
+
+
+DEFAULT_RENDERERS = RendererRegistry()
+
+_active = DEFAULT_RENDERERS
+
+
+def active():
+    return _active
+
+
+def activate(registry):
+    global _active
+    previous = _active
+    _active = registry
+    return previous
@@ -0,0 +1,154 @@
+import hashlib
+import heapq
+import os
+
+from copystatic import copy_files_recursive
+from manifest import BuildManifest
+from output import active as active_output_writer
+from siteindex import SiteIndex
+
+
+SHARD_STRATEGIES = ("hash", "size")
+SHARD_MANIFEST = "build-manifest.json"
+SHARD_OUTPUT = "docs"
+
+
+class Shard:
+    def __init__(self, index, count, strategy="hash"):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(f"invalid shard {index}/{count}: expected 1 <= i <= n")
+        if strategy not in SHARD_STRATEGIES:
+            raise ValueError(f"unknown shard strategy: {strategy}")
+        self.index = index
+        self.count = count
+        self.strategy = strategy
+
+    def __repr__(self):
+        return f"Shard({self.index}/{self.count}, {self.strategy})"
+
+    def dir_path(self, shards_dir):
+        return os.path.join(shards_dir, f"{self.index}-of-{self.count}")
+
+    def select(self, pages, content_dir):
+        keys = {from_path: page_key(from_path, content_dir) for from_path, _ in pages}
+        bins = assign_bins(keys, self.count, self.strategy)
+        return [page for page in pages if bins[page[0]] == self.index - 1]
+
+    def to_data(self, output_dir):
+        return {
+            "index": self.index,
+            "count": self.count,
+            "strategy": self.strategy,
+            "output_dir": os.path.normpath(output_dir),
+        }
+
+
+def parse_shard(spec, strategy="hash"):
+    index, separator, count = spec.partition("/")
+    if not separator or not index.isdigit() or not count.isdigit():
+        raise ValueError(f"invalid shard {spec!r}: expected i/n, e.g. 2/4")
+    return Shard(int(index), int(count), strategy)
+
+
+def page_key(from_path, content_dir):
+    return os.path.relpath(from_path, content_dir).replace(os.sep, "/")
+
+
+def stable_hash(key):
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big")
+
+
+def assign_bins(keys, count, strategy):
+    if strategy == "hash":
+        return {path: stable_hash(key) % count for path, key in keys.items()}
+    sizes = {path: os.path.getsize(path) for path in keys}
+    loads = [(0, number) for number in range(count)]
+    bins = {}
+    for path in sorted(keys, key=lambda path: (-sizes[path], keys[path])):
+        load, number = heapq.heappop(loads)
+        bins[path] = number
+        heapq.heappush(loads, (load + sizes[path], number))
+    return bins
+
+
+def load_shards(shards_dir, count=None):
+    shards = []
+    for name in sorted(os.listdir(shards_dir)):
+        if count is not None and not shard_dir_matches(name, count):
+            continue
+        path = os.path.join(shards_dir, name, SHARD_MANIFEST)
+        if not os.path.isfile(path):
+            continue
+        manifest = BuildManifest.load(path)
+        if manifest is None or manifest.shard is None:
+            raise ValueError(f"not a shard manifest: {path}")
+        shards.append((os.path.join(shards_dir, name), manifest))
+    if not shards:
+        raise ValueError(f"no shard builds found in {shards_dir}")
+    if count is not None:
+        counts = sorted({manifest.shard["count"] for _, manifest in shards} - {count})
+        if counts:
+            raise ValueError(f"shard directories of {count} hold builds of {', '.join(map(str, counts))} shards")
+
+    layouts = {(manifest.shard["count"], manifest.shard["strategy"]) for _, manifest in shards}
+    if len(layouts) > 1:
+        raise ValueError(f"shards disagree on count and strategy: {sorted(layouts)}, pick one with --shards N")
+    count = shards[0][1].shard["count"]
+    indexes = sorted(manifest.shard["index"] for _, manifest in shards)
+    duplicates = sorted({index for index in indexes if indexes.count(index) > 1})
+    if duplicates:
+        raise ValueError(f"shards built more than once: {', '.join(map(str, duplicates))}")
+    missing = sorted(set(range(1, count + 1)) - set(indexes))
+    if missing:
+        raise ValueError(f"missing shards of {count}: {', '.join(map(str, missing))}")
+    return shards
+
+
+def shard_dir_matches(name, count):
+    index, separator, total = name.partition("-of-")
+    return bool(separator) and index.isdigit() and total == str(count)
+
+
+def collect_shard_pages(shards):
+    claims = {}
+    for shard_dir, manifest in shards:
+        output_dir = manifest.shard["output_dir"]
+        for source, entry in manifest.pages.items():
+            relative = os.path.relpath(entry["output"], output_dir)
+            shard_output = os.path.join(shard_dir, SHARD_OUTPUT, relative)
+            claims.setdefault(relative, []).append((manifest.shard["index"], source, shard_output, entry))
+
+    conflicts = [
+        f"{relative} (shards {', '.join(str(index) for index in sorted(owner[0] for owner in owners))})"
+        for relative, owners in sorted(claims.items())
+        if len(owners) > 1
+    ]
+    if conflicts:
+        raise ValueError(f"output paths claimed by more than one shard: {'; '.join(conflicts)}")
+
+    pages = {relative: owners[0][1:] for relative, owners in claims.items()}
+    for relative, (source, shard_output, entry) in pages.items():
+        if not os.path.isfile(shard_output):
+            raise ValueError(f"shard output missing for {source}: {shard_output}")
+    for field in ("basepath", "generator"):
+        values = {entry[field] for _, _, entry in pages.values()}
+        if len(values) > 1:
+            raise ValueError(f"shards were built with different {field} values: {sorted(values)}")
+    return pages
+
+
+def merge_shards(shards_dir, static_dir, dest_dir, manifest, verify_hash=False, count=None):
+    pages = collect_shard_pages(load_shards(shards_dir, count))
+    print("Copying static files to docs directory...")
+    copy_files_recursive(static_dir, dest_dir, manifest, verify_hash)
+    print(f"Merging {len(pages)} pages from {shards_dir}...")
+    site_index = SiteIndex()
+    output_writer = active_output_writer()
+    for relative, (source, shard_output, entry) in sorted(pages.items()):
+        dest_path = os.path.join(dest_dir, relative)
+        output_writer.copy(shard_output, dest_path)
+        manifest.adopt_page(source, entry, dest_path)
+        if "index" in entry:
+            site_index.add(entry["index"])
+    basepaths = {entry["basepath"] for _, _, entry in pages.values()}
+    return site_index, basepaths.pop() if basepaths else "/"
@@ -0,0 +1,147 @@
+import os
+import time
+from xml.sax.saxutils import escape
+
+from htmlnode import ParentNode, RenderedNode
+from renderers import active as active_renderers
+
+
+SUMMARY_CHARS = 280
+FEED_ENTRIES = 20
+
+
+class SiteIndex:
+    def __init__(self):
+        self.entries = {}
+
+    def add(self, entry):
+        self.entries[entry["source"]] = entry
+
+    def pages(self):
+        return sorted(self.entries.values(), key=lambda entry: entry["url"])
+
+    def section(self, section_dir):
+        prefix = os.path.normpath(section_dir) + os.sep
+        entries = [entry for entry in self.entries.values() if entry["source"].startswith(prefix)]
+        return sorted(entries, key=lambda entry: (entry["updated"], entry["url"]), reverse=True)
+
+    def render_sitemap(self, site_url, basepath):
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for entry in self.pages():
+            lines.append(
+                f"<url><loc>{escape(absolute_url(site_url, basepath, entry['url']))}</loc>"
+                f"<lastmod>{format_time(entry['updated'])}</lastmod></url>"
+            )
+        lines.append("</urlset>")
+        return "\n".join(lines) + "\n"
+
+    def render_feed(self, site_url, basepath, section_dir, feed_url, title, author, limit=FEED_ENTRIES):
+        section_index = os.path.join(os.path.normpath(section_dir), "index.md")
+        entries = [entry for entry in self.section(section_dir) if entry["source"] != section_index][:limit]
+        updated = max((entry["updated"] for entry in entries), default=0)
+        lines = [
+            '<?xml version="1.0" encoding="utf-8"?>',
+            '<feed xmlns="http://www.w3.org/2005/Atom">',
+            f"<title>{escape(title)}</title>",
+            f'<link href="{escape(absolute_url(site_url, basepath, ""))}"/>',
+            f'<link rel="self" href="{escape(feed_url)}"/>',
+            f"<id>{escape(feed_url)}</id>",
+            f"<updated>{format_time(updated)}</updated>",
+            f"<author><name>{escape(author)}</name></author>",
+        ]
+        for entry in entries:
+            url = escape(absolute_url(site_url, basepath, entry["url"]))
+            lines.append(
+                f"<entry><title>{escape(entry['title'])}</title>"
+                f'<link href="{url}"/><id>{url}</id>'
+                f"<updated>{format_time(entry['updated'])}</updated>"
+                f"<summary>{escape(entry['summary'])}</summary></entry>"
+            )
+        lines.append("</feed>")
+        return "\n".join(lines) + "\n"
+
+
+def index_entry(from_path, dest_path, dest_dir_path, title, summary):
+    return {
+        "source": os.path.normpath(from_path),
+        "url": page_url(dest_path, dest_dir_path),
+        "title": title,
+        "updated": os.stat(from_path).st_mtime,
+        "summary": summary,
+    }
+
+
+def page_url(dest_path, dest_dir_path):
+    url = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if url == "index.html":
+        return ""
+    if url.endswith("/index.html"):
+        return url[:-len("index.html")]
+    return url
+
+
+def absolute_url(site_url, basepath, url):
+    return site_url.rstrip("/") + basepath + url
+
+
+def format_time(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def summarize(text):
+    if text is None:
+        return ""
+    text = " ".join(text.split())
+    if len(text) <= SUMMARY_CHARS:
+        return text
+    return text[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+class FirstParagraph:
+    def __init__(self):
+        self.text = None
+
+    def add(self, node):
+        if self.text is None:
+            self.text = summary_text(node)
+
+    def add_block(self, block_type, lines):
+        if self.text is None:
+            self.add(active_renderers().render_block(block_type, lines))
+
+
+def first_paragraph(node):
+    for child in node.children:
+        text = summary_text(child)
+        if text is not None:
+            return text
+    return None
+
+
+def summary_text(node):
+    if isinstance(node, RenderedNode):
+        return node.summary
+    if not is_summary_paragraph(node):
+        return None
+    return node_text(node)
+
+
+def is_summary_paragraph(node):
+    if node.tag != "p":
+        return False
+    return any(child.tag not in ("a", "img") and node_text(child).strip() for child in node.children)
+
+
+def node_text(node):
+    parts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ParentNode):
+            stack.extend(reversed(node.children))
+        elif node.tag != "img":
+            parts.append(node.value)
+    return "".join(parts)
@@ -0,0 +1,218 @@
+import os
+import re
+
+
+TAG_PATTERN = re.compile(r"\{\{\s*(.*?)\s*\}\}|\{%\s*(.*?)\s*%\}", re.DOTALL)
+NAME_PATTERN = re.compile(r"^[A-Za-z_][\w]*(\.[A-Za-z_][\w]*)*$")
+
+_template_cache = {}
+
+
+ROOT_URL_PATTERN = re.compile(r'(?<=\s)(href|src)="/')
+
+
+def rewrite_root_urls(text, basepath):
+    if basepath == "/":
+        return text
+    return ROOT_URL_PATTERN.sub(lambda match: f'{match.group(1)}="{basepath}', text)
+
+
+def load_template(template_path, basepath="/"):
+    key = (os.path.abspath(template_path), basepath)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == file_stamps(cached[1].dependencies()):
+        return cached[1]
+    with open(template_path, "r") as f:
+        template = compile_template(f.read(), basepath, template_path)
+    _template_cache[key] = (file_stamps(template.dependencies()), template)
+    return template
+
+
+def file_stamps(paths):
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def clear_template_cache():
+    _template_cache.clear()
+
+
+def compile_template(source, basepath="/", path=None):
+    loader = PartialLoader(path)
+    segments, _ = parse_segments(source, 0, basepath, (), loader)
+    return Template(segments, basepath, path, loader.partials)
+
+
+class PartialLoader:
+    def __init__(self, path):
+        self.stack = [os.path.normpath(path if path is not None else "template")]
+        self.partials = []
+
+    def load(self, name, basepath):
+        path = os.path.normpath(os.path.join(os.path.dirname(self.stack[-1]), name))
+        if os.path.abspath(path) in map(os.path.abspath, self.stack):
+            raise ValueError(f"invalid template: recursive include {name}")
+        try:
+            with open(path, "r") as f:
+                source = f.read()
+        except OSError as e:
+            raise ValueError(f"invalid template: cannot include {name}: {e.strerror}") from e
+        if path not in self.partials:
+            self.partials.append(path)
+        self.stack.append(path)
+        segments, _ = parse_segments(source, 0, basepath, (), self)
+        self.stack.pop()
+        return segments
+
+
+def parse_segments(source, pos, basepath, closers, loader):
+    segments = []
+    while True:
+        match = TAG_PATTERN.search(source, pos)
+        if match is None:
+            if closers:
+                raise ValueError(f"invalid template: missing {{% {closers[-1]} %}}")
+            append_literal(segments, source[pos:], basepath)
+            return segments, (None, len(source))
+        append_literal(segments, source[pos:match.start()], basepath)
+        pos = match.end()
+        if match.group(1) is not None:
+            segments.append(("var", parse_name(match.group(1))))
+            continue
+        words = match.group(2).split()
+        if not words:
+            raise ValueError("invalid template: empty tag")
+        keyword = words[0]
+        if keyword in closers:
+            return segments, (keyword, pos)
+        if keyword == "if":
+            if len(words) != 2:
+                raise ValueError(f"invalid template tag: {match.group(0)}")
+            body, (closer, pos) = parse_segments(source, pos, basepath, ("else", "endif"), loader)
+            else_body = []
+            if closer == "else":
+                else_body, (closer, pos) = parse_segments(source, pos, basepath, ("endif",), loader)
+            segments.append(("if", parse_name(words[1]), body, else_body))
+        elif keyword == "for":
+            if len(words) != 4 or words[2] != "in":
+                raise ValueError(f"invalid template tag: {match.group(0)}")
+            body, (closer, pos) = parse_segments(source, pos, basepath, ("endfor",), loader)
+            segments.append(("for", words[1], parse_name(words[3]), body))
+        elif keyword == "include":
+            if len(words) != 2 or len(words[1]) < 3 or words[1][0] not in "\"'" or words[1][-1] != words[1][0]:
+                raise ValueError(f"invalid template tag: {match.group(0)}")
+            for segment in loader.load(words[1][1:-1], basepath):
+                if isinstance(segment, str):
+                    append_literal(segments, segment, "/")
+                else:
+                    segments.append(segment)
+        else:
+            raise ValueError(f"invalid template tag: {match.group(0)}")
+
+
+def append_literal(segments, text, basepath):
+    if text == "":
+        return
+    text = rewrite_root_urls(text, basepath)
+    if segments and isinstance(segments[-1], str):
+        segments[-1] += text
+    else:
+        segments.append(text)
+
+
+def parse_name(expression):
+    if not NAME_PATTERN.match(expression):
+        raise ValueError(f"invalid template variable: {expression}")
+    return tuple(expression.split("."))
+
+
+def lookup(context, name, default=None, strict=True):
+    value = context
+    for part in name:
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif hasattr(value, part):
+            value = getattr(value, part)
+        elif strict:
+            raise ValueError(f"template variable not defined: {'.'.join(name)}")
+        else:
+            return default
+    return value
+
+
+class Template:
+    def __init__(self, segments, basepath="/", path=None, partials=()):
+        self.segments = segments
+        self.basepath = basepath
+        self.path = path
+        self.partials = list(partials)
+
+    def dependencies(self):
+        if self.path is None:
+            return list(self.partials)
+        return [os.path.normpath(self.path)] + self.partials
+
+    def names(self):
+        names = set()
+        collect_names(self.segments, names)
+        return names
+
+    def render(self, context):
+        out = []
+        render_segments(self.segments, context, out.append, self.basepath)
+        return "".join(out)
+
+    def render_to(self, fp, context):
+        render_segments(self.segments, context, fp.write, self.basepath)
+
+    def __repr__(self):
+        return f"Template({self.segments})"
+
+
+def render_segments(segments, context, emit, basepath="/"):
+    for segment in segments:
+        if isinstance(segment, str):
+            emit(segment)
+            continue
+        kind = segment[0]
+        if kind == "var":
+            render_value(lookup(context, segment[1]), emit, basepath)
+        elif kind == "if":
+            if lookup(context, segment[1], strict=False):
+                render_segments(segment[2], context, emit, basepath)
+            else:
+                render_segments(segment[3], context, emit, basepath)
+        elif kind == "for":
+            name = segment[1]
+            for item in lookup(context, segment[2]):
+                render_segments(segment[3], {**context, name: item}, emit, basepath)
+
+
+def collect_names(segments, names):
+    for segment in segments:
+        if isinstance(segment, str):
+            continue
+        kind = segment[0]
+        if kind == "var":
+            names.add(segment[1][0])
+        elif kind == "if":
+            names.add(segment[1][0])
+            collect_names(segment[2], names)
+            collect_names(segment[3], names)
+        elif kind == "for":
+            names.add(segment[2][0])
+            collect_names(segment[3], names)
+
+
+def render_value(value, emit, basepath="/"):
+    if hasattr(value, "iter_html"):
+        for chunk in value.iter_html(basepath):
+            emit(chunk)
+    else:
+        emit(str(value))
@@ -0,0 +1,85 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import SidecarCompressor
+
+
+class TestSidecarCompressor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative, text):
+        path = os.path.join(self.docs, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_compresses_text_outputs_above_threshold(self):
+        page = self.write("blog/index.html", "<p>hello</p>" * 200)
+        small = self.write("small.css", "body {}")
+        image = self.write("image.png", "x" * 5000)
+        compressor = SidecarCompressor(min_bytes=100, jobs=2)
+        self.assertEqual(compressor.run(self.docs), [page])
+        with gzip.open(page + ".gz", "rb") as f:
+            self.assertEqual(f.read().decode(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+    def test_only_changed_outputs_are_recompressed(self):
+        page = self.write("index.html", "a" * 2000)
+        other = self.write("other.json", "b" * 2000)
+        SidecarCompressor().run(self.docs)
+        with open(other + ".gz", "rb") as f:
+            first = f.read()
+        os.utime(page, ns=(1, 1))
+        compressor = SidecarCompressor()
+        self.assertEqual(compressor.run(self.docs), [page])
+        self.assertEqual(compressor.current, 1)
+        with open(other + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_stale_sidecars_are_removed(self):
+        page = self.write("index.html", "a" * 2000)
+        archive = self.write("archive.tar.gz", "not a sidecar")
+        SidecarCompressor().run(self.docs)
+        os.remove(page)
+        compressor = SidecarCompressor()
+        compressor.run(self.docs)
+        self.assertEqual(compressor.removed, 1)
+        self.assertEqual(sorted(os.listdir(self.docs)), [os.path.basename(archive)])
+
+    def test_refresh_touches_only_given_outputs(self):
+        page = self.write("index.html", "a" * 2000)
+        other = self.write("other.html", "b" * 2000)
+        removed = self.write("gone.html", "c" * 2000)
+        SidecarCompressor().refresh([page, removed])
+        self.assertFalse(os.path.exists(other + ".gz"))
+        os.remove(removed)
+        self.write("index.html", "d" * 2000)
+        os.utime(page, ns=(1, 1))
+        compressor = SidecarCompressor()
+        self.assertEqual(compressor.refresh([page, removed]), [page])
+        self.assertEqual(compressor.removed, 1)
+        self.assertFalse(os.path.exists(removed + ".gz"))
+        with gzip.open(page + ".gz", "rb") as f:
+            self.assertEqual(f.read().decode(), "d" * 2000)
+
+    def test_type_and_level_rules(self):
+        svg = self.write("logo.svg", "<svg></svg>" * 200)
+        compressor = SidecarCompressor(level=1, extensions=(".html",))
+        self.assertEqual(compressor.run(self.docs), [])
+        self.assertFalse(os.path.exists(svg + ".gz"))
+        with self.assertRaises(ValueError):
+            SidecarCompressor(level=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
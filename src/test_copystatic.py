@@ -0,0 +1,80 @@
+import os
+import unittest
+
+from copystatic import copy_files_recursive, file_is_current
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+
+
+class TestCopyStatic(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png-a")
+
+    def sync(self, verify_hash=False):
+        manifest = BuildManifest.load(self.manifest_path, "gen") or BuildManifest(self.manifest_path, "gen")
+        copy_files_recursive(self.static, self.docs, manifest, verify_hash)
+        removed = manifest.prune(self.docs)
+        manifest.save()
+        return removed
+
+    def test_noop_sync_does_not_rewrite_files(self):
+        self.sync()
+        dest = os.path.join(self.docs, "images", "a.png")
+        os.utime(dest, ns=(1, os.stat(dest).st_mtime_ns))
+        inode = os.stat(dest).st_ino
+        self.sync()
+        self.assertEqual(os.stat(dest).st_ino, inode)
+        self.assertEqual(os.stat(dest).st_atime_ns, 1)
+
+    def test_copy_preserves_mtime(self):
+        source = os.path.join(self.static, "index.css")
+        os.utime(source, ns=(0, 1_000_000_000))
+        self.sync()
+        self.assertEqual(os.stat(os.path.join(self.docs, "index.css")).st_mtime_ns, 1_000_000_000)
+
+    def test_changed_file_is_recopied(self):
+        self.sync()
+        source = os.path.join(self.static, "index.css")
+        self.write(source, "body { color: red }")
+        self.sync()
+        with open(os.path.join(self.docs, "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red }")
+
+    def test_deleted_source_is_removed(self):
+        self.write(os.path.join(self.docs, "index.html"), "<p>page</p>")
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        removed = self.sync()
+        self.assertEqual(removed, [os.path.join(self.docs, "images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_verify_hash_detects_same_size_and_mtime_change(self):
+        self.sync()
+        source = os.path.join(self.static, "images", "a.png")
+        dest = os.path.join(self.docs, "images", "a.png")
+        self.write(dest, "png-b")
+        stat = os.stat(source)
+        os.utime(dest, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertTrue(file_is_current(source, dest))
+        self.assertFalse(file_is_current(source, dest, verify_hash=True))
+
+    def test_verify_hash_only_fixes_timestamps_for_identical_content(self):
+        self.sync()
+        source = os.path.join(self.static, "index.css")
+        dest = os.path.join(self.docs, "index.css")
+        os.utime(dest, ns=(0, 5))
+        inode = os.stat(dest).st_ino
+        self.assertTrue(file_is_current(source, dest, verify_hash=True))
+        self.assertEqual(os.stat(dest).st_ino, inode)
+        self.assertEqual(os.stat(dest).st_mtime_ns, os.stat(source).st_mtime_ns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from bench.corpus import CorpusGenerator
+from gencontent import extract_title
+from markdown_blocks import markdown_to_html_node
+
+
+class TestCorpusGenerator(unittest.TestCase):
+
+    def test_pages_are_deterministic(self):
+        first = list(CorpusGenerator(pages=5, seed=3).pages())
+        second = list(CorpusGenerator(pages=5, seed=3).pages())
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, list(CorpusGenerator(pages=5, seed=4).pages()))
+
+    def test_pages_render(self):
+        generator = CorpusGenerator(pages=20, link_density=0.3, emphasis_density=0.3, code_block_ratio=0.3)
+        for _, markdown in generator.pages():
+            self.assertTrue(extract_title(markdown))
+            self.assertTrue(markdown_to_html_node(markdown).to_html().startswith("<div>"))
+
+    def test_unknown_option_raises(self):
+        with self.assertRaisesRegex(ValueError, "unknown corpus options: colour"):
+            CorpusGenerator(colour="blue")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import unittest
+
+from depgraph import DependencyGraph
+from gencontent import generate_pages_recursive
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+from template import clear_template_cache
+
+
+class TestDependencyGraph(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.header = os.path.join(self.root, "partials", "header.html")
+        self.write(self.template, '{% include "partials/header.html" %}{{ Content }}')
+        self.write(self.header, "<header>{{ Title }}</header>")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        clear_template_cache()
+
+    def tearDown(self):
+        clear_template_cache()
+        super().tearDown()
+
+    def build(self, manifest):
+        generate_pages_recursive(self.content, self.template, self.docs, "/", manifest)
+        return DependencyGraph.from_manifest(manifest)
+
+    def test_outputs_record_source_template_and_partials(self):
+        graph = self.build(BuildManifest(os.path.join(self.root, "manifest.json"), "gen"))
+        post = os.path.join(self.docs, "blog", "post.html")
+        self.assertEqual(
+            graph.inputs_of(post),
+            sorted([os.path.join(self.content, "blog", "post.md"), self.template, self.header]),
+        )
+        self.assertEqual(graph.source_of(post), os.path.join(self.content, "blog", "post.md"))
+
+    def test_affected_outputs(self):
+        graph = self.build(BuildManifest(os.path.join(self.root, "manifest.json"), "gen"))
+        index = os.path.join(self.docs, "index.html")
+        post = os.path.join(self.docs, "blog", "post.html")
+        self.assertEqual(graph.affected([self.header]), [post, index])
+        self.assertEqual(graph.affected([os.path.join(self.content, "index.md")]), [index])
+        self.assertEqual(graph.affected([os.path.join(self.root, "unrelated.css")]), [])
+
+    def test_only_affected_pages_are_rebuilt(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"), "gen")
+        self.build(manifest)
+        index = os.path.join(self.docs, "index.html")
+        post = os.path.join(self.docs, "blog", "post.html")
+        os.utime(index, ns=(0, 0))
+        os.utime(post, ns=(0, 0))
+
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Changed")
+        manifest.forget_input(os.path.join(self.content, "blog", "post.md"))
+        self.build(manifest)
+        self.assertEqual(os.stat(index).st_mtime_ns, 0)
+        self.assertNotEqual(os.stat(post).st_mtime_ns, 0)
+
+        os.utime(post, ns=(0, 0))
+        self.write(self.header, "<header class=\"new\">{{ Title }}</header>")
+        manifest.forget_input(self.header)
+        self.build(manifest)
+        self.assertNotEqual(os.stat(index).st_mtime_ns, 0)
+        with open(post) as f:
+            self.assertEqual(f.read(), '<header class="new">Changed</header><div><h1>Changed</h1></div>')
+
+    def test_remove_output(self):
+        graph = DependencyGraph()
+        graph.add("docs/a.html", "content/a.md", ["content/a.md", "template.html"])
+        graph.add("docs/b.html", "content/b.md", ["content/b.md", "template.html"])
+        graph.remove("docs/a.html")
+        self.assertEqual(graph.affected(["template.html"]), ["docs/b.html"])
+        self.assertEqual(graph.dependents_of("content/a.md"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
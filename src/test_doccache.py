@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+
+from doccache import DocumentCache, activate, decode_node, encode_node
+from htmlnode import ROOT_MARKER, LeafNode, ParentNode, RenderedNode
+from markdown_blocks import markdown_to_html_node
+
+
+MARKDOWN = "# Title\n\nSome **bold** and a [link](/about).\n\n```\ncode\n```\n\n- one\n- two"
+
+
+class TestDocumentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir_path = os.path.join(self.tmp.name, "documents")
+
+    def tearDown(self):
+        activate(None)
+        self.tmp.cleanup()
+
+    def test_encode_round_trip(self):
+        node = ParentNode("div", [
+            LeafNode("a", "link", {"href": "/"}),
+            LeafNode(None, "text"),
+            ParentNode("p", [LeafNode("img", "", {"src": "/a.png", "alt": "a"})]),
+        ])
+        self.assertEqual(decode_node(encode_node(node)).to_html("/site/"), node.to_html("/site/"))
+
+    def test_rendered_fragments_are_stored_as_html(self):
+        paragraph = ParentNode("p", [LeafNode("a", "home", {"href": "/"}), LeafNode(None, " page")])
+        node = ParentNode("div", [RenderedNode("p", paragraph.to_html(ROOT_MARKER), "home page")])
+        decoded = decode_node(encode_node(node))
+        self.assertIsInstance(decoded.children[0], RenderedNode)
+        self.assertEqual(decoded.children[0].summary, "home page")
+        self.assertEqual(decoded.to_html("/site/"), '<div><p><a href="/site/">home</a> page</p></div>')
+
+    def test_second_parse_is_loaded_from_disk(self):
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        cache = DocumentCache(self.dir_path, version="v1")
+        activate(cache)
+        self.assertEqual(markdown_to_html_node(MARKDOWN).to_html(), expected)
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 1})
+
+        cache = DocumentCache(self.dir_path, version="v1")
+        activate(cache)
+        self.assertEqual(markdown_to_html_node(MARKDOWN).to_html(), expected)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 0})
+
+    def test_version_mismatch_reparses(self):
+        activate(DocumentCache(self.dir_path, version="v1"))
+        markdown_to_html_node(MARKDOWN)
+        cache = DocumentCache(self.dir_path, version="v2")
+        activate(cache)
+        markdown_to_html_node(MARKDOWN)
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 1})
+
+    def test_corrupt_entry_falls_back_to_parse(self):
+        cache = DocumentCache(self.dir_path, version="v1")
+        path = cache.path_for(cache.key(MARKDOWN))
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"\x00garbage")
+        activate(cache)
+        expected = "<div><h1>Title</h1>"
+        self.assertTrue(markdown_to_html_node(MARKDOWN).to_html().startswith(expected))
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 1})
+        self.assertEqual(cache.load(cache.key(MARKDOWN)).to_html(), markdown_to_html_node(MARKDOWN).to_html())
+
+    def test_least_recently_used_documents_are_evicted(self):
+        cache = DocumentCache(self.dir_path, version="v1")
+        pages = [f"# Page {number}\n\n" + "text " * 50 for number in range(3)]
+        keys = [cache.key(page) for page in pages]
+        for number, (key, page) in enumerate(zip(keys, pages)):
+            cache.store(key, markdown_to_html_node(page))
+            os.utime(cache.path_for(key), ns=(number * 10**9, number * 10**9))
+        size = os.path.getsize(cache.path_for(keys[0]))
+        self.assertIsNotNone(cache.load(keys[0]))
+
+        cache.max_bytes = size * 5 // 2
+        self.assertEqual(cache.evict(), 1)
+        self.assertTrue(os.path.exists(cache.path_for(keys[0])))
+        self.assertFalse(os.path.exists(cache.path_for(keys[1])))
+        self.assertTrue(os.path.exists(cache.path_for(keys[2])))
+        self.assertEqual(cache.evict(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import marshal
+import os
+import tempfile
+import unittest
+
+from doccache import DocumentCache, activate as activate_document_cache
+from fragmentcache import FragmentCache, activate
+from htmlnode import ROOT_MARKER, LeafNode, ParentNode, RenderedNode
+from markdown_blocks import MarkdownStream, markdown_to_html_node
+from profiler import BuildProfiler, activate as activate_profiler
+from siteindex import first_paragraph, summarize
+
+
+DISCLAIMER = "This text is shared by **every** page on the site. " * 8
+
+
+class TestFragmentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "fragments.sqlite3")
+
+    def tearDown(self):
+        activate(None)
+        self.tmp.cleanup()
+
+    def test_fragments_persist_between_builds(self):
+        cache = FragmentCache(self.path, version="v1")
+        key = cache.key("paragraph", "text")
+        self.assertIsNone(cache.get(key))
+        html = ParentNode("p", [LeafNode("a", "text", {"href": "/"})]).to_html(ROOT_MARKER)
+        cache.put(key, "p", html)
+        cache.close()
+
+        cache = FragmentCache(self.path, version="v1")
+        self.assertEqual(cache.get(key), ("p", html, None))
+        self.assertEqual(RenderedNode("p", html).to_html("/site/"), '<p><a href="/site/">text</a></p>')
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 0})
+        cache.close()
+
+    def test_parser_version_is_part_of_the_key(self):
+        first = FragmentCache(self.path, version="v1")
+        second = FragmentCache(self.path, version="v2")
+        self.assertNotEqual(first.key("paragraph", "text"), second.key("paragraph", "text"))
+
+    def test_least_recently_used_fragments_are_evicted(self):
+        html = "x" * 100
+        size = len(marshal.dumps(("p", html, None)))
+        cache = FragmentCache(self.path, max_bytes=size * 5 // 2, version="v1")
+        keys = [cache.key("paragraph", str(number)) for number in range(3)]
+        for key in keys:
+            cache.put(key, "p", html)
+            cache.flush()
+        self.assertEqual(self.stored_keys(cache), set(keys[1:]))
+
+        self.assertEqual(cache.get(keys[1]), ("p", html, None))
+        cache.flush()
+        cache.put(keys[0], "p", html)
+        cache.flush()
+        self.assertEqual(self.stored_keys(cache), {keys[0], keys[1]})
+        cache.close()
+
+    def stored_keys(self, cache):
+        return {row[0] for row in cache.connect().execute("SELECT key FROM fragments")}
+
+    def test_database_from_older_schema_is_replaced(self):
+        cache = FragmentCache(self.path, version="v1")
+        connection = cache.connect()
+        connection.execute("DROP TABLE fragments")
+        connection.execute("CREATE TABLE fragments (key TEXT PRIMARY KEY, html TEXT)")
+        connection.execute("PRAGMA user_version = 1")
+        connection.commit()
+        cache.close()
+
+        cache = FragmentCache(self.path, version="v1")
+        key = cache.key("paragraph", "text")
+        cache.put(key, None, "text")
+        cache.flush()
+        self.assertEqual(self.stored_keys(cache), {key})
+        cache.close()
+
+    def test_corrupt_database_is_replaced(self):
+        with open(self.path, "w") as f:
+            f.write("not a database" * 100)
+        cache = FragmentCache(self.path, version="v1")
+        self.assertIsNone(cache.get(cache.key("paragraph", "text")))
+        cache.close()
+
+    def test_markdown_to_html_node_reuses_repeated_blocks(self):
+        markdown = f"# Page\n\n{DISCLAIMER}\n\nshort\n\n{DISCLAIMER}"
+        expected = markdown_to_html_node(markdown).to_html()
+
+        activate(FragmentCache(self.path, version="v1"))
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(node.to_html(), expected)
+        activate(None).close()
+
+        cache = FragmentCache(self.path, version="v1")
+        activate(cache)
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 0})
+        cache.close()
+
+    def test_hits_skip_the_tree_and_rewrite_the_basepath(self):
+        markdown = f"# Page\n\n[Home](/) {DISCLAIMER}"
+        expected = markdown_to_html_node(markdown).to_html("/site/")
+
+        activate(FragmentCache(self.path, version="v1"))
+        markdown_to_html_node(markdown)
+        activate(None).close()
+
+        activate(FragmentCache(self.path, version="v1"))
+        node = markdown_to_html_node(markdown)
+        self.assertIsInstance(node.children[1], RenderedNode)
+        self.assertEqual(node.to_html("/site/"), expected)
+        self.assertEqual(summarize(first_paragraph(node)), summarize(first_paragraph(markdown_to_html_node(markdown))))
+        activate(None).close()
+
+    def test_hits_escape_the_basepath_like_misses(self):
+        markdown = f"# Page\n\n[Home](/) {DISCLAIMER}"
+        basepath = '/a&b"c/'
+        expected = markdown_to_html_node(markdown).to_html(basepath)
+        activate(FragmentCache(self.path, version="v1"))
+        markdown_to_html_node(markdown)
+        self.assertEqual(markdown_to_html_node(markdown).to_html(basepath), expected)
+        activate(None).close()
+
+    def test_document_cache_keeps_fragments_rendered(self):
+        documents = os.path.join(self.tmp.name, "documents")
+        activate(FragmentCache(self.path, version="v1"))
+        markdown_to_html_node(f"# First\n\n{DISCLAIMER}")
+        activate(None).close()
+
+        profiler = BuildProfiler()
+        activate(FragmentCache(self.path, version="v1"))
+        activate_document_cache(DocumentCache(documents, version="v1"))
+        previous = activate_profiler(profiler)
+        try:
+            for title in ("Second", "Second"):
+                node = markdown_to_html_node(f"# {title}\n\n{DISCLAIMER}")
+                self.assertIsInstance(node.children[1], RenderedNode)
+                self.assertEqual(summarize(first_paragraph(node)), summarize(DISCLAIMER.replace("**", "")))
+        finally:
+            activate_profiler(previous)
+            activate_document_cache(None)
+            activate(None).close()
+        self.assertNotIn("block:paragraph", profiler.stages)
+
+    def test_streamed_pages_flush_pending_fragments_within_budget(self):
+        budget = 4096
+        cache = FragmentCache(self.path, version="v1", max_pending_bytes=budget)
+        activate(cache)
+        lines = (f"Paragraph {number}: {DISCLAIMER}\n" for number in range(200))
+        peak = 0
+        for _ in MarkdownStream(line for text in lines for line in text.split("\n")).iter_html():
+            peak = max(peak, cache.pending_bytes)
+        self.assertLessEqual(peak, budget)
+        cache.flush()
+        self.assertEqual(len(self.stored_keys(cache)), 200)
+        activate(None).close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import unittest
+
+from gencontent import (
+    discover_pages,
+    generate_page,
+    generate_page_streamed,
+    generate_pages_recursive,
+    schedule_page_batches,
+    SMALL_PAGE_BYTES,
+)
+from htmlnode import ParentNode
+from manifest import BuildManifest
+from markdown_blocks import text_to_children
+from renderers import DEFAULT_RENDERERS, activate as activate_renderers
+from sitetest import SiteTestCase
+
+
+def admonition_to_html_node(lines):
+    return ParentNode("aside", text_to_children(" ".join(lines[1:])))
+
+
+class TestGeneratePages(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+
+    def test_basepath_rewrites_urls_but_not_literal_text(self):
+        self.write(
+            os.path.join(self.content, "index.md"),
+            '# Home\n\n[About](/about)\n\n```\n<a href="/raw">\n```',
+        )
+        docs = os.path.join(self.root, "docs")
+        generate_pages_recursive(self.content, self.template, docs, "/site/")
+        with open(os.path.join(docs, "index.html")) as f:
+            self.assertEqual(
+                f.read(),
+                '<title>Home</title><a href="/site/">home</a><div><h1>Home</h1>'
+                '<p><a href="/site/about">About</a></p><pre><code>&lt;a href="/raw"&gt;\n</code></pre></div>',
+            )
+
+    def test_templates_can_loop_over_site_pages(self):
+        self.write(
+            self.template, '<nav>{% for page in Pages %}<a href="/{{ page.url }}">{{ page.title }}</a>{% endfor %}</nav>'
+        )
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        docs = os.path.join(self.root, "docs")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"), "gen")
+        generate_pages_recursive(self.content, self.template, docs, "/site/", manifest)
+        nav = '<nav><a href="/site/">Home</a><a href="/site/blog/">Blog</a></nav>'
+        self.assertEqual(
+            self.read_tree(docs), {"index.html": nav.encode(), os.path.join("blog", "index.html"): nav.encode()}
+        )
+
+        self.write(os.path.join(self.content, "blog", "index.md"), "# News")
+        manifest.forget_input(os.path.join(self.content, "blog", "index.md"))
+        generate_pages_recursive(self.content, self.template, docs, "/site/", manifest)
+        with open(os.path.join(docs, "index.html")) as f:
+            self.assertEqual(f.read(), nav.replace("Blog", "News"))
+
+    def test_streamed_page_matches_in_memory_page(self):
+        source = os.path.join(self.content, "changelog.md")
+        sections = [f"## Release {number}\n\n- fixed [bug](/bugs/{number})\n- more" for number in range(200)]
+        self.write(source, "Intro\n\n# Changelog\n\n" + "\n\n".join(sections) + "\n")
+        in_memory = os.path.join(self.root, "a", "changelog.html")
+        streamed = os.path.join(self.root, "b", "changelog.html")
+        in_memory_info = generate_page(source, self.template, in_memory, "/site/")
+        streamed_info = generate_page_streamed(source, self.template, streamed, "/site/")
+        self.assertEqual(in_memory_info, streamed_info)
+        self.assertEqual(streamed_info, ("Changelog", "Intro"))
+        with open(in_memory) as a, open(streamed) as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_discover_pages_maps_markdown_to_html(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post")
+        pages = discover_pages(self.content, "docs")
+        self.assertEqual(
+            sorted((os.path.relpath(src, self.content), str(dest)) for src, dest in pages),
+            [
+                (os.path.join("blog", "post", "index.md"), os.path.join("docs", "blog", "post", "index.html")),
+                ("index.md", os.path.join("docs", "index.html")),
+            ],
+        )
+
+    def test_schedule_largest_first_and_batches_small_pages(self):
+        big = os.path.join(self.content, "big.md")
+        self.write(big, "# Big\n\n" + "x" * SMALL_PAGE_BYTES)
+        small = []
+        for i in range(3):
+            path = os.path.join(self.content, f"small{i}.md")
+            self.write(path, "# Small\n\n" + "y" * i)
+            small.append((path, path + ".html"))
+        batches = schedule_page_batches(small + [(big, "big.html")])
+        self.assertEqual(batches[0], [(big, "big.html")])
+        self.assertEqual(len(batches), 2)
+        self.assertEqual([src for src, _ in batches[1]], [small[2][0], small[1][0], small[0][0]])
+
+    def test_parallel_output_matches_serial(self):
+        for i in range(6):
+            self.write(
+                os.path.join(self.content, f"section{i % 2}", f"page{i}.md"),
+                f"# Page {i}\n\nSome **bold** text and a [link](/page{i}).\n\n- one\n- two",
+            )
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content, self.template, serial, "/base/")
+        generate_pages_recursive(self.content, self.template, parallel, "/base/", jobs=2)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+
+    def test_parallel_workers_use_the_active_renderers(self):
+        for i in range(4):
+            self.write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n!!! note\nMind the **gap**")
+        registry = DEFAULT_RENDERERS.copy()
+        registry.register_block("admonition", admonition_to_html_node, ("!!! ",))
+        previous = activate_renderers(registry)
+        try:
+            generate_pages_recursive(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=2)
+            registry.register_block("note", lambda lines: ParentNode("aside", []), ("!! ",))
+            with self.assertRaisesRegex(ValueError, "module-level functions"):
+                generate_pages_recursive(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=2)
+        finally:
+            activate_renderers(previous)
+        with open(os.path.join(self.root, "out", "page0.html")) as f:
+            self.assertIn("<aside>Mind the <b>gap</b></aside>", f.read())
+
+    def test_errors_name_source_file_in_every_mode(self):
+        self.write(os.path.join(self.content, "good.md"), "# Good")
+        bad = os.path.join(self.content, "bad.md")
+        self.write(bad, "no title here")
+        for jobs in (1, 2):
+            with self.subTest(jobs=jobs):
+                with self.assertRaises(ValueError) as cm:
+                    generate_pages_recursive(self.content, self.template, os.path.join(self.root, "out"), "/", jobs=jobs)
+                self.assertIn(bad, str(cm.exception))
+                self.assertIn("no title found", str(cm.exception))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+
 import unittest
 
 from htmlnode import HTMLNode
@@ -6,6 +8,8 @@ from htmlnode import LeafNode
 
 from htmlnode import ParentNode 
 
+from htmlnode import escape_attribute, escape_text
+
 class TestHTMLNode(unittest.TestCase):
 
     def test_props_to_html(self):
@@ -354,6 +358,134 @@ class TestHTMLNode(unittest.TestCase):
         )
 
 
+    def test_to_html_deeply_nested(self):
+
+        node = LeafNode("b", "deep")
+
+        for _ in range(5000):
+
+            node = ParentNode("span", [node])
+
+        html = node.to_html()
+
+        self.assertTrue(html.startswith("<span><span>"))
+
+        self.assertEqual(len(html), 5000 * len("<span></span>") + len("<b>deep</b>"))
+
+
+    def test_write_html_streams_chunks(self):
+
+        node = ParentNode(
+
+            "ul",
+
+            [ParentNode("li", [LeafNode(None, f"item {i}")]) for i in range(3)],
+
+            {"class": "list"},
+
+        )
+
+        out = io.StringIO()
+
+        node.write_html(out)
+
+        self.assertEqual(out.getvalue(), node.to_html())
+
+        self.assertEqual(
+
+            out.getvalue(),
+
+            '<ul class="list"><li>item 0</li><li>item 1</li><li>item 2</li></ul>',
+
+        )
+
+
+    def test_iter_html_raises_for_invalid_child(self):
+
+        node = ParentNode("div", [ParentNode("p", None)])
+
+        with self.assertRaisesRegex(ValueError, "invalid HTML: no children"):
+
+            list(node.iter_html())
+
+
+    def test_basepath_rewrites_root_relative_url_props(self):
+
+        node = ParentNode("p", [
+
+            LeafNode("a", 'see href="/x"', {"href": "/about", "title": "/about"}),
+
+            LeafNode("img", "", {"src": "/a.png", "alt": "a"}),
+
+            LeafNode("a", "ext", {"href": "https://example.com/"}),
+
+        ])
+
+        self.assertEqual(
+
+            node.to_html("/site/"),
+
+            '<p><a href="/site/about" title="/about">see href="/x"</a>'
+
+            '<img src="/site/a.png" alt="a"></img><a href="https://example.com/">ext</a></p>',
+
+        )
+
+        self.assertEqual(node.to_html(), node.to_html("/"))
+
+    def test_nodes_use_slots(self):
+
+        for node in (HTMLNode("p", "text"), LeafNode("b", "text"), ParentNode("p", [])):
+
+            self.assertFalse(hasattr(node, "__dict__"))
+
+            with self.assertRaises(AttributeError):
+
+                node.extra = 1
+
+
+    def test_empty_props_share_none(self):
+
+        node = LeafNode("p", "text", {})
+
+        self.assertIsNone(node.props)
+
+        self.assertEqual(node.to_html(), "<p>text</p>")
+
+
+    def test_text_and_attribute_values_are_escaped(self):
+
+        node = ParentNode("p", [
+
+            LeafNode(None, "1 < 2 & 3 > \"0\""),
+
+            LeafNode("a", "<b>", {"href": '/x?a=1&b="2"', "title": "<t>"}),
+
+        ])
+
+        self.assertEqual(
+
+            node.to_html("/site/"),
+
+            '<p>1 &lt; 2 &amp; 3 &gt; "0"'
+
+            '<a href="/site/x?a=1&amp;b=&quot;2&quot;" title="&lt;t&gt;">&lt;b&gt;</a></p>',
+
+        )
+
+
+    def test_escape_fast_path_returns_plain_strings(self):
+
+        text = "nothing to escape here"
+
+        self.assertIs(escape_text(text), text)
+
+        self.assertIs(escape_attribute(text), text)
+
+        self.assertEqual(escape_text("&amp;"), "&amp;amp;")
+
+
+
 if __name__ == "__main__":
 
     unittest.main() 
\ No newline at end of file
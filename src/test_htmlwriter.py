@@ -0,0 +1,130 @@
+import os
+import tempfile
+import unittest
+
+from bench.corpus import CorpusGenerator
+from gencontent import generate_pages_recursive
+from htmlnode import LeafNode, ParentNode
+from htmlwriter import HTMLStream, markdown_to_html
+from markdown_blocks import markdown_to_html_node, text_to_children
+from renderers import DEFAULT_RENDERERS, activate
+from textnode import TextType
+
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content")
+BASEPATHS = ("/", "/Static_Site_Generator/")
+
+
+def content_pages():
+    for root, _, filenames in os.walk(CONTENT_DIR):
+        for filename in sorted(filenames):
+            if filename.endswith(".md"):
+                path = os.path.join(root, filename)
+                with open(path) as f:
+                    yield path, f.read()
+
+
+class TestHTMLWriter(unittest.TestCase):
+
+    def assertBackendsMatch(self, name, markdown):
+        for basepath in BASEPATHS:
+            with self.subTest(page=name, basepath=basepath):
+                self.assertEqual(
+                    markdown_to_html(markdown, basepath),
+                    markdown_to_html_node(markdown).to_html(basepath),
+                )
+
+    def test_matches_tree_backend_on_site_content(self):
+        pages = list(content_pages())
+        self.assertTrue(pages)
+        for path, markdown in pages:
+            self.assertBackendsMatch(path, markdown)
+
+    def test_matches_tree_backend_on_generated_corpus(self):
+        generator = CorpusGenerator(pages=40, link_density=0.4, emphasis_density=0.4, code_block_ratio=0.3)
+        for name, markdown in generator.pages():
+            self.assertBackendsMatch(name, markdown)
+
+    def test_matches_tree_backend_on_edge_cases(self):
+        samples = [
+            "Tom & Jerry <script>alert('x')</script>",
+            "**bold _italic [link **x**](/a?b=1&c=\"2\")_ bold**",
+            "![alt \"quoted\" & <b>](/images/a.png) and [home](/)",
+            "```\n<pre> & </pre>\n```",
+            "> quote with `code <b>`\n> and _more_",
+            "1. first `x`\n2. second [y](/y)",
+            "- one\n- _two_\n- ",
+            "####### seven",
+            "unclosed **bold and _italic [bracket ``tick",
+            "",
+        ]
+        for markdown in samples:
+            self.assertBackendsMatch(repr(markdown), markdown)
+
+    def test_stream_matches_document(self):
+        markdown = "# Title\n\nSome **bold** text\n\n```\ncode\n```\n\n- a\n- [b](/b)"
+        stream = HTMLStream(markdown.split("\n"))
+        self.assertEqual("".join(stream.iter_html("/site/")), markdown_to_html(markdown, "/site/"))
+
+    def test_on_block_sees_every_block(self):
+        blocks = []
+        markdown_to_html("# Title\n\ntext\n\n- item", on_block=lambda block_type, lines: blocks.append(lines))
+        self.assertEqual(blocks, [["# Title"], ["text"], ["- item"]])
+
+    def test_custom_handlers_fall_back_to_tree_rendering(self):
+        registry = DEFAULT_RENDERERS.copy()
+        registry.register_block(
+            "admonition",
+            lambda lines: ParentNode("aside", text_to_children(" ".join(lines[1:]))),
+            ("!!! ",),
+        )
+        registry.register_inline(
+            TextType.BOLD,
+            lambda children, url: ParentNode("strong", children),
+        )
+        previous = activate(registry)
+        try:
+            markdown = "!!! note\nMind the **gap**\n\nA **bold** [link](/x)"
+            self.assertBackendsMatch("custom", markdown)
+            self.assertIn("<strong>gap</strong>", markdown_to_html(markdown))
+        finally:
+            activate(previous)
+
+    def test_custom_block_keeps_builtin_writers_for_other_blocks(self):
+        registry = DEFAULT_RENDERERS.copy()
+        registry.register_block("note", lambda lines: LeafNode("aside", lines[0][3:]), ("!! ",))
+        previous = activate(registry)
+        try:
+            self.assertBackendsMatch("note", "!! <careful>\n\n**after**")
+        finally:
+            activate(previous)
+
+    def test_site_builds_identically_with_both_backends(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(os.path.join(content, "blog"))
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title><main>{{ Content }}</main>")
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\n[< Back](/)\n\nWelcome to **the** [site](/blog/post)")
+            with open(os.path.join(content, "blog", "post.md"), "w") as f:
+                f.write("# Post & more\n\n> quoted\n\n1. one\n2. two")
+            outputs = {}
+            for backend in ("tree", "string"):
+                docs = os.path.join(root, backend)
+                site_index = generate_pages_recursive(content, template, docs, "/site/", backend=backend)
+                pages = {}
+                for dir_path, _, filenames in os.walk(docs):
+                    for filename in filenames:
+                        path = os.path.join(dir_path, filename)
+                        with open(path) as f:
+                            pages[os.path.relpath(path, docs)] = f.read()
+                summaries = sorted((entry["title"], entry["summary"]) for entry in site_index.pages())
+                outputs[backend] = pages, summaries
+        self.assertEqual(outputs["tree"], outputs["string"])
+        self.assertIn(("Home", "Welcome to the site"), outputs["string"][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
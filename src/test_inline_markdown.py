@@ -1,3 +1,5 @@
+import re
+
 import unittest
 
 from inline_markdown import (
@@ -12,7 +14,9 @@ from inline_markdown import (
 )
 
 
-from textnode import TextNode, TextType
+from inline_parser import text_to_html
+
+from textnode import TextNode, TextType, text_node_to_html_node
 
 
 class TestInlineMarkdown(unittest.TestCase):
@@ -1747,6 +1751,108 @@ class TestInlineMarkdown(unittest.TestCase):
         self.assertIn("invalid markdown, link section not closed", str(cm.exception)) 
 
 
+    def test_text_to_textnodes_matches_split_pipeline(self):
+
+        samples = [
+
+            "[](![a**_)]()[](]",
+
+            "**a_b_c**",
+
+            "`a**b**c`",
+
+            "_a [l](u) b_",
+
+            "!![img](i.png) and [link](l) with **bold** and `code`",
+
+            "text ![a](b) then [c",
+
+            "**x** [a](b) _y_ ![c](d) `z`",
+
+        ]
+
+        for text in samples:
+
+            nodes = [TextNode(text, TextType.TEXT)]
+
+            expected = None
+
+            try:
+
+                nodes = split_nodes_image(nodes)
+
+                nodes = split_nodes_link(nodes)
+
+                nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+
+                nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+
+                expected = split_nodes_delimiter(nodes, "`", TextType.CODE)
+
+            except ValueError as e:
+
+                with self.assertRaisesRegex(ValueError, re.escape(str(e))):
+
+                    text_to_textnodes(text)
+
+                continue
+
+            self.assertListEqual(text_to_textnodes(text), expected)
+
+
+    def test_text_to_textnodes_many_links(self):
+
+        text = " ".join(f"[l{i}](u{i})" for i in range(2000))
+
+        nodes = text_to_textnodes(text)
+
+        self.assertEqual(len(nodes), 3999)
+
+        self.assertEqual(nodes[-1], TextNode("l1999", TextType.LINK, "u1999"))
+
+
+    def test_text_to_textnodes_renders_like_the_page_parser(self):
+
+        samples = [
+
+            "This is **text** with an _italic_ word and a `code block` and an "
+
+            "![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+
+            "plain text only",
+
+            "**bold**_italic_`code`",
+
+            "[< Back Home](/) and ![img](/images/a.png)",
+
+        ]
+
+        for text in samples:
+
+            nodes = [text_node_to_html_node(node) for node in text_to_textnodes(text)]
+
+            self.assertEqual("".join(node.to_html("/site/") for node in nodes), text_to_html(text, "/site/"))
+
+
+    def test_text_to_textnodes_keeps_legacy_semantics(self):
+
+        with self.assertRaisesRegex(ValueError, "formatted section not closed"):
+
+            text_to_textnodes("a snake_case here")
+
+        self.assertEqual(text_to_html("a snake_case here"), "a snake_case here")
+
+        self.assertListEqual(
+
+            text_to_textnodes("a snake_case_name"),
+
+            [TextNode("a snake", TextType.TEXT), TextNode("case", TextType.ITALIC), TextNode("name", TextType.TEXT)],
+
+        )
+
+        self.assertEqual(text_to_html("a snake_case_name"), "a snake_case_name")
+
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from inline_parser import text_to_html_nodes
+
+
+def render(text):
+    return "".join(node.to_html() for node in text_to_html_nodes(text))
+
+
+class TestInlineParser(unittest.TestCase):
+
+    def test_nested_emphasis_builds_parent_nodes(self):
+        nodes = text_to_html_nodes("**bold _italic_ bold**")
+        self.assertEqual(len(nodes), 1)
+        self.assertIsInstance(nodes[0], ParentNode)
+        self.assertEqual(nodes[0].tag, "b")
+        self.assertEqual(render("**bold _italic_ bold**"), "<b>bold <i>italic</i> bold</b>")
+        self.assertEqual(render("_a **b** c_"), "<i>a <b>b</b> c</i>")
+
+    def test_single_text_emphasis_stays_a_leaf(self):
+        nodes = text_to_html_nodes("a **b** c")
+        self.assertIsInstance(nodes[1], LeafNode)
+        self.assertEqual(nodes[1].value, "b")
+
+    def test_emphasis_inside_link_text(self):
+        self.assertEqual(render("[**bold** link](/x)"), '<a href="/x"><b>bold</b> link</a>')
+        self.assertEqual(render("**[link](/x)**"), '<b><a href="/x">link</a></b>')
+
+    def test_link_binds_tighter_than_emphasis(self):
+        self.assertEqual(render("**[a**](/u)"), '**<a href="/u">a**</a>')
+
+    def test_unmatched_delimiters_are_literal(self):
+        self.assertEqual(render("snake_case_name"), "snake_case_name")
+        self.assertEqual(render("unclosed **bold and _italic"), "unclosed **bold and _italic")
+        self.assertEqual(render("a `tick and [bracket"), "a `tick and [bracket")
+        self.assertEqual(render("x * y ** z"), "x * y ** z")
+
+    def test_overlapping_emphasis_closes_nearest(self):
+        self.assertEqual(render("_a **b_ c**"), "<i>a **b</i> c**")
+
+    def test_double_underscore_is_bold(self):
+        self.assertEqual(render("__a__"), "<b>a</b>")
+
+    def test_code_span_keeps_delimiters_literal(self):
+        self.assertEqual(render("`a_b **c**`"), "<code>a_b **c**</code>")
+        self.assertEqual(render("``a ` b`` c"), "<code>a ` b</code> c")
+
+    def test_image_alt_is_raw_text(self):
+        nodes = text_to_html_nodes("![alt _x_](/i.png)")
+        self.assertEqual(nodes[0].props, {"src": "/i.png", "alt": "alt _x_"})
+
+    def test_many_unmatched_delimiters(self):
+        text = "_a **b [c ](" * 5000 + "`"
+        self.assertEqual(render(text), text)
+        self.assertEqual(render("_a_ " * 5000), "<i>a</i> " * 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import unittest
+
+from manifest import BuildManifest
+from sitetest import SiteTestCase
+
+
+class TestBuildManifest(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.root, "index.md")
+        self.template = os.path.join(self.root, "template.html")
+        self.dest_root = os.path.join(self.root, "docs")
+        self.dest = os.path.join(self.dest_root, "blog", "index.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.write(self.source, "# Title")
+        self.write(self.template, "{{ Content }}")
+        self.write(self.dest, "<p>old</p>")
+
+    def recorded(self):
+        manifest = BuildManifest(self.manifest_path, "gen-1")
+        manifest.record_page(self.source, self.template, self.dest, "/")
+        manifest.save()
+        return BuildManifest.load(self.manifest_path, "gen-1")
+
+    def test_unchanged_page_is_current(self):
+        manifest = self.recorded()
+        self.assertTrue(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+
+    def test_changed_source_is_not_current(self):
+        manifest = self.recorded()
+        self.write(self.source, "# Other title")
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+
+    def test_changed_template_basepath_or_generator_is_not_current(self):
+        manifest = self.recorded()
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/site/"))
+        manifest = BuildManifest.load(self.manifest_path, "gen-2")
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+        manifest = self.recorded()
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+
+    def test_changed_or_missing_partial_is_not_current(self):
+        partial = os.path.join(self.root, "header.html")
+        self.write(partial, "<header></header>")
+        manifest = BuildManifest(self.manifest_path, "gen-1")
+        manifest.record_page(self.source, self.template, self.dest, "/", [partial])
+        self.assertTrue(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+        self.write(partial, "<header>new</header>")
+        manifest.forget_input(partial)
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+        os.remove(partial)
+        manifest.forget_input(partial)
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+
+    def test_missing_output_is_not_current(self):
+        manifest = self.recorded()
+        os.remove(self.dest)
+        self.assertFalse(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+
+    def test_prune_removes_outputs_of_vanished_sources(self):
+        manifest = self.recorded()
+        removed = manifest.prune(self.dest_root)
+        self.assertEqual(removed, [os.path.normpath(self.dest)])
+        self.assertFalse(os.path.exists(os.path.dirname(self.dest)))
+        self.assertTrue(os.path.isdir(self.dest_root))
+        self.assertEqual(manifest.pages, {})
+
+    def test_remove_unrecorded_outputs(self):
+        manifest = BuildManifest(self.manifest_path, "gen-1")
+        manifest.record_page(self.source, self.template, self.dest, "/")
+        stale = os.path.join(self.dest_root, "old", "page.html")
+        self.write(stale, "<p>stale</p>")
+        self.assertEqual(manifest.remove_unrecorded(self.dest_root), [os.path.normpath(stale)])
+        self.assertFalse(os.path.exists(os.path.dirname(stale)))
+        self.assertTrue(os.path.exists(self.dest))
+
+    def test_generated_outputs_survive_cleanup_until_no_longer_written(self):
+        sitemap = os.path.join(self.dest_root, "sitemap.xml")
+        self.write(sitemap, "<urlset/>")
+        manifest = BuildManifest(self.manifest_path, "gen-1")
+        manifest.record_page(self.source, self.template, self.dest, "/")
+        manifest.record_generated("sitemap", sitemap)
+        self.assertEqual(manifest.remove_unrecorded(self.dest_root), [])
+        manifest.save()
+        manifest = BuildManifest.load(self.manifest_path, "gen-1")
+        self.assertTrue(manifest.page_is_current(self.source, self.template, self.dest, "/"))
+        self.assertEqual(manifest.prune(self.dest_root), [os.path.normpath(sitemap)])
+        self.assertFalse(os.path.exists(sitemap))
+
+    def test_load_rejects_corrupt_manifest(self):
+        self.write(self.manifest_path, "{not json")
+        self.assertIsNone(BuildManifest.load(self.manifest_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
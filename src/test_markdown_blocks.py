@@ -4,6 +4,8 @@ from markdown_blocks import (
     markdown_to_blocks,
     block_to_block_type,
     BlockType,
+    MarkdownStream,
+    scan_blocks,
 )
 
 class TestMarkdownToBlocksEdgeCases(unittest.TestCase):
@@ -202,5 +204,90 @@ This is another paragraph with _italic_ text and `code` here"""
             ),
         )
 
+    def test_fenced_code_keeps_blank_lines(self):
+        md = """
+Intro
+
+```python
+def f():
+
+    return 1
+```
+
+After
+"""
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(blocks[1], "```python\ndef f():\n\n    return 1\n```")
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html,
+            "<div><p>Intro</p><pre><code>def f():\n\n    return 1\n</code></pre><p>After</p></div>",
+        )
+
+    def test_fenced_code_keeps_markdown_literal(self):
+        md = "````\n# not a heading\n\n```\n- not a list\n````"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code># not a heading\n\n```\n- not a list\n</code></pre></div>")
+
+    def test_fence_interrupts_paragraph_and_list(self):
+        md = "Example:\n```\nline one\n\n# line two\n```\n- item\n```\n- not an item\n```"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Example:", "```\nline one\n\n# line two\n```", "- item", "```\n- not an item\n```"],
+        )
+        self.assertEqual(
+            markdown_to_html_node(md).to_html(),
+            "<div><p>Example:</p><pre><code>line one\n\n# line two\n</code></pre>"
+            "<ul><li>item</li></ul><pre><code>- not an item\n</code></pre></div>",
+        )
+
+    def test_code_blocks_are_escaped(self):
+        html = markdown_to_html_node("```\nif a < b && c > d:\n```\n\n`<br>` & more").to_html()
+        self.assertEqual(
+            html,
+            "<div><pre><code>if a &lt; b &amp;&amp; c &gt; d:\n</code></pre>"
+            "<p><code>&lt;br&gt;</code> &amp; more</p></div>",
+        )
+
+    def test_unclosed_fence_runs_to_end(self):
+        html = markdown_to_html_node("```\ncode\n\nmore").to_html()
+        self.assertEqual(html, "<div><pre><code>code\n\nmore\n</code></pre></div>")
+
+    def test_unclosed_long_fence_keeps_shorter_fence_lines(self):
+        html = markdown_to_html_node("````\ncode\n```").to_html()
+        self.assertEqual(html, "<div><pre><code>code\n```\n</code></pre></div>")
+
+    def test_whitespace_only_lines_separate_blocks(self):
+        md = "first\n   \nsecond\n\t\n\n"
+        self.assertEqual(markdown_to_blocks(md), ["first", "second"])
+        self.assertEqual(markdown_to_html_node(md).to_html(), "<div><p>first</p><p>second</p></div>")
+
+    def test_scan_blocks_types(self):
+        lines = "# Title\n\n> a\n> b\n\n- x\n- y\n\n1. x\n3. y\n\n```\ncode\n```".split("\n")
+        self.assertEqual(
+            [block_type for block_type, _ in scan_blocks(lines)],
+            [BlockType.HEADING, BlockType.QUOTE, BlockType.ULIST, BlockType.PARAGRAPH, BlockType.CODE],
+        )
+
+    def test_markdown_stream_matches_tree(self):
+        md = "# Title\n\nSome [link](/a) here\n\n```\ncode\n\nmore\n```\n\n- a\n- b\n\n> quote"
+        streamed = "".join(MarkdownStream(iter(md.split("\n"))).iter_html("/site/"))
+        self.assertEqual(streamed, markdown_to_html_node(md).to_html("/site/"))
+
+    def test_markdown_stream_reads_lines_lazily(self):
+        consumed = []
+
+        def lines():
+            for number in range(1000):
+                consumed.append(number)
+                yield f"paragraph {number}"
+                yield ""
+
+        chunks = MarkdownStream(lines()).iter_html()
+        self.assertEqual(next(chunks), "<div>")
+        self.assertEqual(next(chunks), "<p>")
+        self.assertLess(len(consumed), 3)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from output import OutputWriter
+
+
+class TestOutputWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.path = os.path.join(self.root, "docs", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_identical_output_is_not_rewritten(self):
+        writer = OutputWriter()
+        self.assertTrue(writer.write_text(self.path, "<p>héllo</p>"))
+        os.utime(self.path, ns=(0, 0))
+        self.assertFalse(writer.write_text(self.path, "<p>héllo</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertTrue(writer.write_text(self.path, "<p>hello!</p>"))
+        self.assertEqual(self.read(), "<p>hello!</p>")
+        self.assertEqual(writer.stats(), {"written": 2, "unchanged": 1})
+
+    def test_streamed_output_is_compared_before_replacing(self):
+        writer = OutputWriter()
+        with writer.open(self.path) as f:
+            f.write("<p>")
+            f.write("streamed</p>")
+        os.utime(self.path, ns=(0, 0))
+        with writer.open(self.path) as f:
+            f.write("<p>streamed</p>")
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual(writer.stats(), {"written": 1, "unchanged": 1})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+    def test_failed_write_keeps_previous_file(self):
+        writer = OutputWriter()
+        writer.write_text(self.path, "<p>old</p>")
+        with self.assertRaises(RuntimeError):
+            with writer.open(self.path) as f:
+                f.write("<p>trunc")
+                raise RuntimeError("render failed")
+        self.assertEqual(self.read(), "<p>old</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import unittest
+
+from gencontent import generate_pages_recursive
+from pipeline import PipelineConfig
+from profiler import BuildProfiler, activate
+from sitetest import SiteTestCase
+
+
+class TestPipeline(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+
+    def test_pipeline_output_matches_serial(self):
+        for number in range(40):
+            self.write(
+                os.path.join(self.content, f"section{number % 3}", f"page{number}.md"),
+                f"# Page {number}\n\n[link](/page{number})\n\n- a\n- b",
+            )
+        serial = os.path.join(self.root, "serial")
+        pipelined = os.path.join(self.root, "pipelined")
+        generate_pages_recursive(self.content, self.template, serial, "/site/")
+        config = PipelineConfig(read_ahead=2, write_behind=1, io_workers=3)
+        generate_pages_recursive(self.content, self.template, pipelined, "/site/", pipeline=config)
+        self.assertEqual(len(self.read_tree(pipelined)), 40)
+        self.assertEqual(self.read_tree(pipelined), self.read_tree(serial))
+
+    def test_pipeline_error_names_source_file(self):
+        self.write(os.path.join(self.content, "good.md"), "# Good")
+        self.write(os.path.join(self.content, "bad.md"), "no title")
+        with self.assertRaisesRegex(ValueError, "failed to generate .*bad.md: no title found"):
+            generate_pages_recursive(
+                self.content, self.template, os.path.join(self.root, "docs"), "/", pipeline=PipelineConfig(1, 1, 1)
+            )
+
+    def test_pipeline_refuses_to_run_under_the_profiler(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        previous = activate(BuildProfiler())
+        try:
+            with self.assertRaisesRegex(ValueError, "cannot run with a pipeline"):
+                generate_pages_recursive(
+                    self.content, self.template, os.path.join(self.root, "docs"), "/", pipeline=PipelineConfig()
+                )
+        finally:
+            activate(previous)
+
+    def test_config_rejects_empty_queues(self):
+        with self.assertRaises(ValueError):
+            PipelineConfig(read_ahead=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
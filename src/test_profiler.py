@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+import unittest
+
+from gencontent import generate_pages_recursive
+from profiler import BuildProfiler, activate, stage
+
+
+class TestProfiler(unittest.TestCase):
+
+    def tearDown(self):
+        activate(None)
+
+    def test_stage_is_noop_when_inactive(self):
+        with stage("read"):
+            pass
+
+    def test_nested_stages_record_exclusive_time(self):
+        profiler = BuildProfiler()
+        activate(profiler)
+        with stage("outer"):
+            with stage("inner"):
+                time.sleep(0.02)
+        self.assertGreaterEqual(profiler.stages["inner"]["wall"], 0.02)
+        self.assertLess(profiler.stages["outer"]["wall"], 0.02)
+        self.assertEqual(profiler.stages["outer"]["calls"], 1)
+
+    def test_build_records_pages_and_stages(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content, f"{name}.md"), "w") as f:
+                    f.write(f"# {name}\n\nSome **bold** text\n\n- one\n- two")
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+            for jobs in (1, 2):
+                profiler = BuildProfiler()
+                activate(profiler)
+                generate_pages_recursive(content, template, os.path.join(root, f"docs{jobs}"), "/", jobs=jobs)
+                activate(None)
+                report = profiler.report(top=2)
+                self.assertEqual(report["pages"], 3)
+                self.assertEqual(len(report["slowest_pages"]), 2)
+                for name in ("read", "block_split", "inline_parse", "tree_build", "serialize", "template", "write"):
+                    self.assertIn(name, report["stages"])
+                page = report["slowest_pages"][0]
+                self.assertEqual(page["nodes"], 12)
+                self.assertEqual(page["bytes"], len("<title>a</title><div><h1>a</h1><p>Some <b>bold</b> text</p><ul><li>one</li><li>two</li></ul></div>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
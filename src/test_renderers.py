@@ -0,0 +1,87 @@
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from manifest import parser_version
+from markdown_blocks import BlockType, block_to_block_type, markdown_to_html_node, text_to_children
+from profiler import BuildProfiler, activate as activate_profiler
+from renderers import DEFAULT_RENDERERS, CustomBlockType, RendererRegistry, activate
+from textnode import TextNode, TextType, text_node_to_html_node
+
+
+def admonition_to_html_node(lines):
+    kind = lines[0][len("!!! "):].strip()
+    return ParentNode("aside", text_to_children(" ".join(lines[1:])), {"class": kind})
+
+
+def callout_to_html_node(lines):
+    return ParentNode("div", text_to_children(" ".join(line.lstrip("> ") for line in lines[1:])), {"class": "callout"})
+
+
+def image_to_figure(children, url):
+    return ParentNode("figure", [LeafNode("img", "", {"src": url})], {"title": children[0].value})
+
+
+class TestRenderers(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = DEFAULT_RENDERERS.copy()
+        self.previous = activate(self.registry)
+
+    def tearDown(self):
+        activate(self.previous)
+
+    def test_custom_block_type_is_detected_and_rendered(self):
+        admonition = self.registry.register_block("admonition", admonition_to_html_node, ("!!! ",))
+        self.assertIsInstance(admonition, CustomBlockType)
+        html = markdown_to_html_node("!!! warning\nMind the **gap**\n\nAfter").to_html()
+        self.assertEqual(html, '<div><aside class="warning">Mind the <b>gap</b></aside><p>After</p></div>')
+        self.assertEqual(block_to_block_type("!!! note\ntext"), admonition)
+
+    def test_longer_prefix_wins_over_builtin(self):
+        self.registry.register_block("callout", callout_to_html_node, ("> [!",), ">")
+        html = markdown_to_html_node("> [!NOTE]\n> Read this\n\n> plain quote").to_html()
+        self.assertEqual(
+            html,
+            '<div><div class="callout">Read this</div><blockquote>plain quote</blockquote></div>',
+        )
+
+    def test_override_builtin_inline_handler(self):
+        self.registry.register_inline(TextType.IMAGE, image_to_figure)
+        html = markdown_to_html_node("See ![cat](/cat.png)").to_html()
+        self.assertEqual(html, '<div><p>See <figure title="cat"><img src="/cat.png"></img></figure></p></div>')
+        node = text_node_to_html_node(TextNode("dog", TextType.IMAGE, "/dog.png"))
+        self.assertEqual(node.tag, "figure")
+
+    def test_copy_leaves_default_registry_untouched(self):
+        self.registry.register_block("admonition", admonition_to_html_node, ("!!! ",))
+        activate(DEFAULT_RENDERERS)
+        self.assertEqual(block_to_block_type("!!! note\ntext"), BlockType.PARAGRAPH)
+
+    def test_registrations_change_parser_version(self):
+        before = parser_version()
+        self.registry.register_block("admonition", admonition_to_html_node, ("!!! ",))
+        self.assertNotEqual(parser_version(), before)
+
+    def test_unknown_types_raise(self):
+        registry = RendererRegistry()
+        with self.assertRaisesRegex(ValueError, "invalid block type"):
+            registry.render_block(BlockType.PARAGRAPH, ["text"])
+        with self.assertRaisesRegex(ValueError, "invalid text type"):
+            registry.render_inline(TextType.BOLD, [])
+        with self.assertRaises(ValueError):
+            registry.register_block("empty", admonition_to_html_node, ("",))
+
+    def test_handlers_are_timed_as_profile_stages(self):
+        profiler = BuildProfiler()
+        previous = activate_profiler(profiler)
+        try:
+            markdown_to_html_node("# Title\n\nSome **bold** and `code`\n\n- item")
+        finally:
+            activate_profiler(previous)
+        for name in ("block:heading", "block:paragraph", "block:unordered_list", "inline:bold", "inline:code"):
+            self.assertIn(name, profiler.stages)
+        self.assertEqual(profiler.stages["block:paragraph"]["calls"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
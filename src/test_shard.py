@@ -0,0 +1,145 @@
+import contextlib
+import io
+import os
+import unittest
+
+from gencontent import discover_pages, generate_pages_recursive
+from manifest import BuildManifest
+from shard import SHARD_MANIFEST, SHARD_OUTPUT, Shard, merge_shards, parse_shard
+from sitetest import SiteTestCase
+from template import clear_template_cache
+
+
+class TestShard(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.shards = os.path.join(self.root, "shards")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.static, "site.css"), "body {}")
+        for number in range(12):
+            self.write(
+                os.path.join(self.content, f"section-{number % 3}", f"page-{number}.md"),
+                f"# Page {number}\n\n" + "Some [text](/home). " * (number * 7 + 1),
+            )
+        clear_template_cache()
+
+    def tearDown(self):
+        clear_template_cache()
+        super().tearDown()
+
+    def pages(self, content=None):
+        return discover_pages(content or self.content, os.path.join(self.root, "docs"))
+
+    def build_shard(self, shard):
+        shard_dir = shard.dir_path(self.shards)
+        output_dir = os.path.join(shard_dir, SHARD_OUTPUT)
+        manifest = BuildManifest(os.path.join(shard_dir, SHARD_MANIFEST), "gen")
+        manifest.shard = shard.to_data(output_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(self.content, self.template, output_dir, "/site/", manifest, shard=shard)
+        manifest.save()
+        return manifest
+
+    def merge(self, dest_dir, count=None):
+        manifest = BuildManifest(os.path.join(self.root, "merged.json"), "gen")
+        with contextlib.redirect_stdout(io.StringIO()):
+            site_index, basepath = merge_shards(self.shards, self.static, dest_dir, manifest, count=count)
+        return manifest, site_index, basepath
+
+    def test_parse_shard(self):
+        shard = parse_shard("2/4", "size")
+        self.assertEqual((shard.index, shard.count, shard.strategy), (2, 4, "size"))
+        for spec in ("0/2", "3/2", "1/0", "a/b", "2", "1/2/3"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+        with self.assertRaisesRegex(ValueError, "unknown shard strategy"):
+            parse_shard("1/2", "random")
+
+    def test_shards_partition_the_content(self):
+        pages = self.pages()
+        for strategy in ("hash", "size"):
+            slices = [Shard(index, 3, strategy).select(pages, self.content) for index in range(1, 4)]
+            selected = [page for pages_slice in slices for page in pages_slice]
+            self.assertEqual(sorted(selected), sorted(pages))
+            self.assertEqual(slices, [Shard(index, 3, strategy).select(pages, self.content) for index in range(1, 4)])
+
+    def test_hash_assignment_does_not_depend_on_checkout_location(self):
+        other = os.path.join(self.root, "elsewhere", "content")
+        for from_path, _ in self.pages():
+            with open(from_path) as f:
+                self.write(os.path.join(other, os.path.relpath(from_path, self.content)), f.read())
+        shard = Shard(1, 2)
+        here = [os.path.relpath(path, self.content) for path, _ in shard.select(self.pages(), self.content)]
+        there = [os.path.relpath(path, other) for path, _ in shard.select(self.pages(other), other)]
+        self.assertEqual(sorted(here), sorted(there))
+
+    def test_size_bins_are_balanced(self):
+        pages = self.pages()
+        loads = [
+            sum(os.path.getsize(path) for path, _ in Shard(index, 3, "size").select(pages, self.content))
+            for index in range(1, 4)
+        ]
+        largest = max(os.path.getsize(path) for path, _ in pages)
+        self.assertLessEqual(max(loads) - min(loads), largest)
+
+    def test_merge_matches_a_single_build(self):
+        for index in range(1, 4):
+            self.build_shard(Shard(index, 3, "size"))
+        merged = os.path.join(self.root, "merged")
+        manifest, site_index, basepath = self.merge(merged)
+
+        single = os.path.join(self.root, "single")
+        with contextlib.redirect_stdout(io.StringIO()):
+            single_index = generate_pages_recursive(self.content, self.template, single, "/site/")
+        expected = self.read_tree(single)
+        expected["site.css"] = b"body {}"
+        self.assertEqual(self.read_tree(merged), expected)
+        self.assertEqual(basepath, "/site/")
+        self.assertEqual(site_index.pages(), single_index.pages())
+        self.assertEqual(len(manifest.pages), 12)
+        self.assertTrue(all(entry["output"].startswith(os.path.normpath(merged)) for entry in manifest.pages.values()))
+
+    def test_merge_rejects_outputs_claimed_by_two_shards(self):
+        self.build_shard(Shard(1, 2))
+        second = self.build_shard(Shard(2, 2))
+        first = BuildManifest.load(os.path.join(Shard(1, 2).dir_path(self.shards), SHARD_MANIFEST))
+        source, entry = next(iter(first.pages.items()))
+        relative = os.path.relpath(entry["output"], first.shard["output_dir"])
+        claimed = os.path.join(second.shard["output_dir"], relative)
+        self.write(claimed, "<p>duplicate</p>")
+        second.pages[source + ".copy"] = {**entry, "output": os.path.normpath(claimed)}
+        second.save()
+        with self.assertRaisesRegex(ValueError, "claimed by more than one shard: .*shards 1, 2"):
+            self.merge(os.path.join(self.root, "merged"))
+
+    def test_merge_requires_every_shard(self):
+        self.build_shard(Shard(1, 3))
+        self.build_shard(Shard(3, 3))
+        with self.assertRaisesRegex(ValueError, "missing shards of 3: 2"):
+            self.merge(os.path.join(self.root, "merged"))
+
+    def test_merge_rejects_mixed_shard_layouts(self):
+        self.build_shard(Shard(1, 2))
+        self.build_shard(Shard(2, 2, "size"))
+        with self.assertRaisesRegex(ValueError, "disagree"):
+            self.merge(os.path.join(self.root, "merged"))
+
+    def test_merge_picks_one_layout_by_shard_count(self):
+        for index in range(1, 4):
+            self.build_shard(Shard(index, 3))
+        for index in range(1, 3):
+            self.build_shard(Shard(index, 2))
+        with self.assertRaisesRegex(ValueError, "disagree.*--shards N"):
+            self.merge(os.path.join(self.root, "merged"))
+        manifest, _, _ = self.merge(os.path.join(self.root, "merged"), count=2)
+        self.assertEqual(len(manifest.pages), 12)
+        with self.assertRaisesRegex(ValueError, "no shard builds found"):
+            self.merge(os.path.join(self.root, "merged"), count=4)
+
+
+if __name__ == "__main__":
+    unittest.main()
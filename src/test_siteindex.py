@@ -0,0 +1,97 @@
+import contextlib
+import io
+import os
+import unittest
+
+from gencontent import generate_pages_recursive
+from manifest import BuildManifest
+from markdown_blocks import markdown_to_html_node
+from siteindex import SUMMARY_CHARS, SiteIndex, first_paragraph, index_entry, summarize
+from sitetest import SiteTestCase
+from template import clear_template_cache
+
+
+class TestSiteIndex(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome & hello.")
+        self.write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nAll posts.")
+        self.write(
+            os.path.join(self.content, "blog", "old", "index.md"),
+            "# Old post\n\n[< Back Home](/)\n\nThe **first** real paragraph.\n\nSecond paragraph.",
+        )
+        self.write(os.path.join(self.content, "blog", "new.md"), "# New post\n\n- a list\n\nNewest words.")
+        os.utime(os.path.join(self.content, "blog", "old", "index.md"), (1000, 1000))
+        os.utime(os.path.join(self.content, "blog", "new.md"), (2000, 2000))
+        clear_template_cache()
+
+    def tearDown(self):
+        clear_template_cache()
+        super().tearDown()
+
+    def test_build_collects_titles_urls_and_summaries(self):
+        site_index = generate_pages_recursive(self.content, self.template, self.docs, "/")
+        pages = {entry["url"]: (entry["title"], entry["summary"]) for entry in site_index.pages()}
+        self.assertEqual(
+            pages,
+            {
+                "": ("Home", "Welcome & hello."),
+                "blog/": ("Blog", "All posts."),
+                "blog/new.html": ("New post", "Newest words."),
+                "blog/old/": ("Old post", "The first real paragraph."),
+            },
+        )
+
+    def test_incremental_build_reuses_recorded_entries(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"), "gen")
+        first = generate_pages_recursive(self.content, self.template, self.docs, "/", manifest)
+        manifest.save()
+        manifest = BuildManifest.load(os.path.join(self.root, "manifest.json"), "gen")
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            second = generate_pages_recursive(self.content, self.template, self.docs, "/", manifest)
+        self.assertEqual(log.getvalue(), "")
+        self.assertEqual(second.pages(), first.pages())
+
+    def test_section_feed_lists_newest_pages_first(self):
+        site_index = generate_pages_recursive(self.content, self.template, self.docs, "/site/")
+        feed = site_index.render_feed(
+            "https://example.com/", "/site/", os.path.join(self.content, "blog"),
+            "https://example.com/site/atom.xml", "Blog", "Me",
+        )
+        self.assertIn("<updated>1970-01-01T00:33:20Z</updated>", feed)
+        self.assertLess(feed.index("New post"), feed.index("Old post"))
+        self.assertIn('<link href="https://example.com/site/blog/old/"/>', feed)
+        self.assertNotIn("All posts.", feed)
+        self.assertNotIn("Welcome", feed)
+
+    def test_sitemap_escapes_and_sorts_urls(self):
+        site_index = SiteIndex()
+        site_index.add({"source": "b.md", "url": "b&c.html", "title": "B", "updated": 0, "summary": ""})
+        site_index.add({"source": "a.md", "url": "", "title": "A", "updated": 0, "summary": ""})
+        sitemap = site_index.render_sitemap("https://example.com", "/")
+        self.assertLess(sitemap.index("<loc>https://example.com/</loc>"), sitemap.index("b&amp;c.html"))
+        self.assertIn("<lastmod>1970-01-01T00:00:00Z</lastmod>", sitemap)
+
+    def test_index_entry_maps_index_pages_to_directories(self):
+        source = os.path.join(self.content, "blog", "old", "index.md")
+        entry = index_entry(source, os.path.join(self.docs, "blog", "old", "index.html"), self.docs, "T", "S")
+        self.assertEqual(entry["url"], "blog/old/")
+        self.assertEqual(entry["updated"], 1000)
+
+    def test_summary_skips_link_only_paragraphs_and_truncates(self):
+        words = " ".join(["word"] * 100)
+        node = markdown_to_html_node(f"# T\n\n[home](/) ![img](/a.png)\n\n{words}")
+        summary = summarize(first_paragraph(node))
+        self.assertTrue(summary.endswith("word…"))
+        self.assertLessEqual(len(summary), SUMMARY_CHARS + 1)
+        self.assertEqual(summarize(first_paragraph(markdown_to_html_node("# Only a title"))), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import io
+import os
+import tempfile
+import unittest
+
+from htmlnode import LeafNode, ParentNode
+from template import (
+    clear_template_cache,
+    compile_template,
+    load_template,
+    rewrite_root_urls,
+)
+
+
+class TestTemplate(unittest.TestCase):
+
+    def test_render_placeholders(self):
+        template = compile_template("<title> {{ Title }} </title>{{Content}}")
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<title> Home </title><p>hi</p>",
+        )
+
+    def test_literal_segments_are_merged(self):
+        template = compile_template("<p>{{ a }}</p><div>{{ b }}</div>")
+        self.assertEqual(template.segments, ["<p>", ("var", ("a",)), "</p><div>", ("var", ("b",)), "</div>"])
+
+    def test_basepath_applied_to_literals_at_compile_time(self):
+        template = compile_template('<link href="/index.css"><img src="/a.png">{{ x }}', "/site/")
+        self.assertEqual(template.segments[0], '<link href="/site/index.css"><img src="/site/a.png">')
+        self.assertEqual(template.render({"x": 'href="/raw'}), template.segments[0] + 'href="/raw')
+
+    def test_rewrite_root_urls_only_touches_attributes(self):
+        text = '<a href="/x">x</a> <img src="/y.png"> <code>href="/literal"</code>'
+        self.assertEqual(
+            rewrite_root_urls(text, "/site/"),
+            '<a href="/site/x">x</a> <img src="/site/y.png"> <code>href="/literal"</code>',
+        )
+        self.assertIs(rewrite_root_urls(text, "/"), text)
+
+    def test_render_to_applies_basepath_to_node_props(self):
+        template = compile_template("<main>{{ Content }}</main>", "/site/")
+        node = ParentNode("p", [
+            LeafNode("a", 'href="/raw"', {"href": "/about"}),
+            LeafNode("img", "", {"src": "https://example.com/a.png", "alt": ""}),
+        ])
+        out = io.StringIO()
+        template.render_to(out, {"Content": node})
+        self.assertEqual(
+            out.getvalue(),
+            '<main><p><a href="/site/about">href="/raw"</a><img src="https://example.com/a.png" alt=""></img></p></main>',
+        )
+
+    def test_include_inlines_partials_and_lists_dependencies(self):
+        with tempfile.TemporaryDirectory() as root:
+            template_path = os.path.join(root, "template.html")
+            partial_path = os.path.join(root, "partials", "nav.html")
+            os.makedirs(os.path.dirname(partial_path))
+            with open(template_path, "w") as f:
+                f.write('<body>{% include "partials/nav.html" %}{{ Content }}</body>')
+            with open(partial_path, "w") as f:
+                f.write('<a href="/">{{ Title }}</a>{% include "item.html" %}')
+            with open(os.path.join(root, "partials", "item.html"), "w") as f:
+                f.write("<i>item</i>")
+            template = load_template(template_path, "/site/")
+            self.assertEqual(
+                template.render({"Title": "T", "Content": "c"}),
+                '<body><a href="/site/">T</a><i>item</i>c</body>',
+            )
+            self.assertEqual(
+                template.dependencies(),
+                [template_path, partial_path, os.path.join(root, "partials", "item.html")],
+            )
+
+    def test_recursive_include_raises(self):
+        with tempfile.TemporaryDirectory() as root:
+            template_path = os.path.join(root, "loop.html")
+            with open(template_path, "w") as f:
+                f.write('{% include "loop.html" %}')
+            with self.assertRaisesRegex(ValueError, "recursive include loop.html"):
+                load_template(template_path)
+
+    def test_missing_include_raises(self):
+        with self.assertRaisesRegex(ValueError, "cannot include missing.html"):
+            compile_template('{% include "missing.html" %}', "/", os.path.join(tempfile.gettempdir(), "t.html"))
+
+    def test_render_to_streams_node_values(self):
+        template = compile_template("<main>{{ Content }}</main>")
+        out = io.StringIO()
+        template.render_to(out, {"Content": ParentNode("p", [LeafNode(None, "hi")])})
+        self.assertEqual(out.getvalue(), "<main><p>hi</p></main>")
+
+    def test_conditionals(self):
+        template = compile_template("{% if draft %}draft{% else %}live{% endif %}")
+        self.assertEqual(template.render({"draft": True}), "draft")
+        self.assertEqual(template.render({"draft": False}), "live")
+        self.assertEqual(template.render({}), "live")
+
+    def test_loops_with_dotted_names(self):
+        template = compile_template(
+            "<ul>{% for page in pages %}<li>{{ page.title }}</li>{% endfor %}</ul>"
+        )
+        pages = [{"title": "One"}, {"title": "Two"}]
+        self.assertEqual(template.render({"pages": pages}), "<ul><li>One</li><li>Two</li></ul>")
+
+    def test_nested_blocks(self):
+        template = compile_template(
+            "{% for page in pages %}{% if page.draft %}*{% endif %}{{ page.title }};{% endfor %}"
+        )
+        pages = [{"title": "a", "draft": True}, {"title": "b", "draft": False}]
+        self.assertEqual(template.render({"pages": pages}), "*a;b;")
+
+    def test_names_lists_referenced_variables(self):
+        template = compile_template(
+            "{{ Title }}{% for page in Pages %}{% if page.draft %}{{ Footer }}{% endif %}{% endfor %}"
+        )
+        self.assertEqual(template.names(), {"Title", "Pages", "page", "Footer"})
+
+    def test_undefined_variable_raises(self):
+        template = compile_template("{{ missing }}")
+        with self.assertRaisesRegex(ValueError, "template variable not defined: missing"):
+            template.render({})
+
+    def test_unclosed_block_raises(self):
+        with self.assertRaisesRegex(ValueError, "missing {% endif %}"):
+            compile_template("{% if x %}open")
+
+    def test_stray_closer_raises(self):
+        with self.assertRaisesRegex(ValueError, "invalid template tag"):
+            compile_template("{% endfor %}")
+
+    def test_load_template_is_cached_until_file_changes(self):
+        clear_template_cache()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(load_template(path).render({"Title": "x"}), "<h1>x</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
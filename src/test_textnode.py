@@ -181,6 +181,37 @@ class TestTextNode(unittest.TestCase):
             ) 
 
 
+    def test_text_node_is_hashable(self):
+
+        node = TextNode("This is a text node", TextType.LINK, "https://example.com")
+
+        same = TextNode("This is a text node", TextType.LINK, "https://example.com")
+
+        self.assertEqual(hash(node), hash(same))
+
+        self.assertEqual(len({node, same}), 1)
+
+        cache = {node: "cached"}
+
+        self.assertEqual(cache[same], "cached")
+
+
+    def test_text_node_is_immutable(self):
+
+        node = TextNode("This is a text node", TextType.TEXT)
+
+        with self.assertRaises(AttributeError):
+
+            node.text = "changed"
+
+        with self.assertRaises(AttributeError):
+
+            del node.url
+
+        self.assertFalse(hasattr(node, "__dict__"))
+
+
+
 if __name__ == "__main__":
 
     unittest.main()
@@ -0,0 +1,165 @@
+import gzip
+import os
+import threading
+import unittest
+
+from compress import SidecarCompressor
+from manifest import BuildManifest
+from output import OutputWriter, activate as activate_output_writer
+from sitetest import SiteTestCase
+from watch import ChangeWatcher, LiveReload, SiteRebuilder, diff_snapshots, inotify_simple, snapshot
+
+
+class TestWatch(SiteTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"), "gen")
+        self.rebuilder = SiteRebuilder(
+            self.content, self.static, self.template, self.docs, "/", self.manifest
+        )
+
+    def test_snapshot_diff(self):
+        before = snapshot([self.content, self.template])
+        self.write(os.path.join(self.content, "new.md"), "# New")
+        os.remove(os.path.join(self.content, "index.md"))
+        changed, removed = diff_snapshots(before, snapshot([self.content, self.template]))
+        self.assertEqual(changed, {os.path.join(self.content, "new.md")})
+        self.assertEqual(removed, {os.path.join(self.content, "index.md")})
+
+    def assertWatcherSeesEdits(self, use_inotify):
+        watcher = ChangeWatcher([self.content, self.template], interval=0.01, debounce=0.01, use_inotify=use_inotify)
+        post = os.path.join(self.content, "blog", "post.md")
+        page = os.path.join(self.content, "new", "page.md")
+        self.write(post, "# Edited")
+        self.assertEqual(watcher.wait_for_changes(), ({post}, set()))
+        self.write(page, "# New")
+        self.assertEqual(watcher.wait_for_changes(), ({page}, set()))
+        self.write(self.template, "{{ Content }}")
+        self.assertEqual(watcher.wait_for_changes(), ({self.template}, set()))
+        os.remove(page)
+        os.rmdir(os.path.dirname(page))
+        self.assertEqual(watcher.wait_for_changes(), (set(), {page}))
+        self.assertEqual(watcher.files, snapshot([self.content, self.template]))
+
+    def test_watcher_polls_for_changes(self):
+        self.assertWatcherSeesEdits(False)
+
+    @unittest.skipIf(inotify_simple is None, "inotify_simple is not installed")
+    def test_watcher_reads_inotify_events(self):
+        self.assertWatcherSeesEdits(True)
+
+    def test_poll_interval_scales_with_scan_time(self):
+        watcher = ChangeWatcher([self.content], interval=0.05, use_inotify=False)
+        watcher.scan_seconds = 0.001
+        self.assertEqual(watcher.poll_interval(), 0.05)
+        watcher.scan_seconds = 0.2
+        self.assertAlmostEqual(watcher.poll_interval(), 2.0)
+
+    def test_apply_rebuilds_only_changed_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.rebuilder.apply({post}, set())
+        self.assertEqual(self.read(os.path.join(self.docs, "blog", "post.html")), "<title>Post</title><div><h1>Post</h1></div>")
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html")))
+
+    def test_apply_template_change_rebuilds_all_pages(self):
+        self.rebuilder.apply({self.template}, set())
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+
+    def test_apply_partial_change_rebuilds_pages_using_it(self):
+        partial = os.path.join(self.root, "header.html")
+        self.write(partial, "<header>one</header>")
+        self.write(self.template, '{% include "header.html" %}{{ Content }}')
+        self.rebuilder.apply({self.template}, set())
+        self.assertIn(partial, self.rebuilder.watched_paths())
+
+        self.write(partial, "<header>two</header>")
+        self.rebuilder.apply({partial}, set())
+        self.assertEqual(
+            self.read(os.path.join(self.docs, "blog", "post.html")),
+            "<header>two</header><div><h1>Post</h1></div>",
+        )
+
+    def test_apply_static_copy_and_removals(self):
+        css = os.path.join(self.static, "index.css")
+        post = os.path.join(self.content, "blog", "post.md")
+        self.rebuilder.apply({css, post}, set())
+        self.assertEqual(self.read(os.path.join(self.docs, "index.css")), "body {}")
+        os.remove(css)
+        os.remove(post)
+        self.rebuilder.apply(set(), {css, post})
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+
+    def test_apply_copies_static_through_output_writer(self):
+        css = os.path.join(self.static, "index.css")
+        writer = OutputWriter()
+        previous = activate_output_writer(writer)
+        try:
+            self.rebuilder.apply({css}, set())
+            self.rebuilder.apply({css}, set())
+        finally:
+            activate_output_writer(previous)
+        self.assertEqual(writer.stats(), {"written": 1, "unchanged": 1})
+        self.assertEqual(os.stat(css).st_mtime_ns, os.stat(os.path.join(self.docs, "index.css")).st_mtime_ns)
+
+    def test_apply_refreshes_gzip_sidecars(self):
+        self.rebuilder.compressor = SidecarCompressor(min_bytes=1)
+        post = os.path.join(self.content, "blog", "post.md")
+        output = os.path.join(self.docs, "blog", "post.html")
+        self.rebuilder.apply({post}, set())
+        self.assertTrue(os.path.exists(output + ".gz"))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.html.gz")))
+
+        self.write(post, "# Edited")
+        self.rebuilder.apply({post}, set())
+        with gzip.open(output + ".gz", "rb") as f:
+            self.assertEqual(f.read().decode(), self.read(output))
+
+        os.remove(post)
+        self.rebuilder.apply(set(), {post})
+        self.assertFalse(os.path.exists(os.path.dirname(output)))
+
+    def test_apply_rebuilds_page_lists_when_a_title_changes(self):
+        self.write(self.template, "{% for page in Pages %}{{ page.title }};{% endfor %}{{ Content }}")
+        self.rebuilder.apply({self.template}, set())
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Edited")
+        self.rebuilder.apply({post}, set())
+        self.assertEqual(self.read(os.path.join(self.docs, "index.html")), "Home;Edited;<div><h1>Home</h1></div>")
+
+    def test_apply_rewrites_site_index_from_manifest(self):
+        written = []
+        self.rebuilder.site_index_writer = lambda site_index: written.append(site_index.pages()) or []
+        home = os.path.join(self.content, "index.md")
+        post = os.path.join(self.content, "blog", "post.md")
+        self.rebuilder.apply({home, post}, set())
+        self.write(post, "# Edited")
+        self.rebuilder.apply({post}, set())
+        os.remove(home)
+        self.rebuilder.apply(set(), {home})
+        self.rebuilder.apply({os.path.join(self.static, "index.css")}, set())
+        titles = [sorted(entry["title"] for entry in pages) for pages in written]
+        self.assertEqual(titles, [["Home", "Post"], ["Edited", "Home"], ["Edited"]])
+
+    def test_live_reload_wakes_waiters(self):
+        live_reload = LiveReload()
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(live_reload.wait(0, 5)))
+        waiter.start()
+        live_reload.notify()
+        waiter.join(5)
+        self.assertEqual(results, [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
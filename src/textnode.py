@@ -1,7 +1,9 @@
-from htmlnode import LeafNode
+from htmlnode import LeafNode, ParentNode
 
 from enum import Enum
 
+from renderers import DEFAULT_RENDERERS, active as active_renderers
+
 class TextType(Enum):
 
     TEXT = "text"
@@ -19,13 +21,26 @@ class TextType(Enum):
 
 class TextNode:
 
+    __slots__ = ("text", "text_type", "url")
+
+
     def __init__(self, text, text_type, url = None):
 
-        self.text = text
+        object.__setattr__(self, "text", text)
+
+        object.__setattr__(self, "text_type", text_type)
+
+        object.__setattr__(self, "url", url)
+
+
+    def __setattr__(self, name, value):
+
+        raise AttributeError(f"TextNode is immutable, cannot set {name}")
 
-        self.text_type = text_type
 
-        self.url = url
+    def __delattr__(self, name):
+
+        raise AttributeError(f"TextNode is immutable, cannot delete {name}")
 
 
     def __eq__(self, other):
@@ -37,24 +52,66 @@ class TextNode:
         return False 
 
 
+    def __hash__(self):
+
+        return hash((self.text, self.text_type, self.url))
+
+
     def __repr__(self):
 
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
         
 
 def text_node_to_html_node(text_node):
-    if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
-    if text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    raise ValueError(f"invalid text type: {text_node.text_type}")
+    return active_renderers().render_inline(text_node.text_type, [LeafNode(None, text_node.text)], text_node.url)
+
+
+def inline_element(tag, children, props=None):
+    if not children:
+        return LeafNode(tag, "", props)
+    if len(children) == 1 and children[0].tag is None:
+        return LeafNode(tag, children[0].value, props)
+    return ParentNode(tag, children, props)
+
+
+def plain_text(children):
+    return "".join(child.value for child in children if child.tag is None)
+
+
+def render_text(children, url):
+    if len(children) == 1:
+        return children[0]
+    return LeafNode(None, plain_text(children))
+
+
+def render_bold(children, url):
+    return inline_element("b", children)
+
+
+def render_italic(children, url):
+    return inline_element("i", children)
+
+
+def render_code(children, url):
+    return LeafNode("code", plain_text(children))
+
+
+def render_link(children, url):
+    return inline_element("a", children, {"href": url})
+
+
+def render_image(children, url):
+    return LeafNode("img", "", {"src": url, "alt": plain_text(children)})
+
 
+BUILTIN_INLINE_HANDLERS = {
+    TextType.TEXT: render_text,
+    TextType.BOLD: render_bold,
+    TextType.ITALIC: render_italic,
+    TextType.CODE: render_code,
+    TextType.LINK: render_link,
+    TextType.IMAGE: render_image,
+}
 
+for text_type, handler in BUILTIN_INLINE_HANDLERS.items():
+    DEFAULT_RENDERERS.register_inline(text_type, handler)
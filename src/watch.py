@@ -0,0 +1,340 @@
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from doccache import active as active_document_cache
+from fragmentcache import active as active_fragment_cache
+from gencontent import generate_page, generate_pages_recursive
+from manifest import remove_empty_dirs
+from output import active as active_output_writer
+from siteindex import SiteIndex, index_entry
+from template import load_template
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+LIVE_RELOAD_PATH = "/__livereload"
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource(\"" + LIVE_RELOAD_PATH + "\")"
+    ".addEventListener(\"reload\", function () { location.reload(); });</script>"
+)
+KEEPALIVE_SECONDS = 15
+POLL_SCAN_RATIO = 10
+INOTIFY_TIMEOUT_SECONDS = 1
+
+
+def snapshot(paths, dirs=None):
+    files = {}
+    for path in paths:
+        if os.path.isdir(path):
+            scan_tree(path, files, dirs)
+        elif os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def scan_tree(dir_path, files, dirs=None):
+    if dirs is not None:
+        dirs.add(dir_path)
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                scan_tree(entry.path, files, dirs)
+            elif entry.is_file():
+                stat = entry.stat()
+                files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+
+def diff_snapshots(old, new):
+    changed = {path for path, signature in new.items() if old.get(path) != signature}
+    removed = set(old) - set(new)
+    return changed, removed
+
+
+class ChangeWatcher:
+    def __init__(self, paths, interval=0.05, debounce=0.03, use_inotify=True):
+        self.paths = [os.path.normpath(path) for path in paths]
+        self.roots = tuple(path + os.sep for path in self.paths if os.path.isdir(path))
+        self.interval = interval
+        self.debounce = debounce
+        self.dirs = set()
+        start = time.perf_counter()
+        self.files = snapshot(self.paths, self.dirs)
+        self.scan_seconds = time.perf_counter() - start
+        self.inotify = None
+        self.watches = {}
+        if use_inotify and inotify_simple is not None:
+            self.inotify = inotify_simple.INotify()
+            self.add_watches()
+
+    def add_watches(self):
+        flags = inotify_simple.flags
+        mask = flags.CREATE | flags.DELETE | flags.MODIFY | flags.MOVED_FROM | flags.MOVED_TO | flags.CLOSE_WRITE
+        dirs = {os.path.dirname(path) or "." for path in self.paths if not os.path.isdir(path)} | self.dirs
+        for dir_path in dirs - set(self.watches.values()):
+            try:
+                self.watches[self.inotify.add_watch(dir_path, mask)] = dir_path
+            except OSError:
+                continue
+
+    def poll_interval(self):
+        return max(self.interval, self.scan_seconds * POLL_SCAN_RATIO)
+
+    def wait_for_changes(self):
+        while True:
+            if self.inotify is None:
+                time.sleep(self.poll_interval())
+                paths = self.rescan()
+            else:
+                paths = self.read_events(INOTIFY_TIMEOUT_SECONDS)
+            if not paths:
+                continue
+            changed, removed = self.update(self.settle(paths))
+            if changed or removed:
+                return changed, removed
+
+    def rescan(self):
+        start = time.perf_counter()
+        changed, removed = diff_snapshots(self.files, snapshot(self.paths))
+        self.scan_seconds = time.perf_counter() - start
+        return changed | removed
+
+    def read_events(self, timeout):
+        paths = set()
+        for event in self.inotify.read(timeout=int(timeout * 1000)):
+            if event.mask & inotify_simple.flags.Q_OVERFLOW:
+                return paths | self.rescan()
+            if event.mask & inotify_simple.flags.IGNORED:
+                path = self.watches.pop(event.wd, None)
+            elif event.wd in self.watches:
+                path = os.path.normpath(os.path.join(self.watches[event.wd], event.name))
+            else:
+                continue
+            if path is not None and self.covers(path):
+                paths.add(path)
+        return paths
+
+    def covers(self, path):
+        return path in self.paths or path.startswith(self.roots)
+
+    def settle(self, paths):
+        signatures = snapshot(sorted(paths))
+        while True:
+            time.sleep(self.debounce)
+            if self.inotify is not None:
+                paths = paths | self.read_events(0)
+            settled = snapshot(sorted(paths))
+            if settled == signatures:
+                return paths
+            signatures = settled
+
+    def update(self, paths):
+        dirs = set()
+        files = snapshot(sorted(paths), dirs)
+        prefixes = tuple(path + os.sep for path in paths)
+        changed = {path for path, signature in files.items() if self.files.get(path) != signature}
+        removed = {path for path in self.files if (path in paths or path.startswith(prefixes)) and path not in files}
+        self.files.update(files)
+        for path in removed:
+            del self.files[path]
+        self.dirs = {path for path in self.dirs if path not in paths and not path.startswith(prefixes)} | dirs
+        if self.inotify is not None:
+            self.add_watches()
+        return changed, removed
+
+
+class SiteRebuilder:
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath, manifest, backend="tree", compressor=None, site_index_writer=None):
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest = manifest
+        self.backend = backend
+        self.compressor = compressor
+        self.site_index_writer = site_index_writer
+
+    def watched_paths(self):
+        return [self.content_dir, self.static_dir] + self.template_inputs()
+
+    def template_inputs(self):
+        try:
+            return load_template(self.template_path, self.basepath).dependencies()
+        except (OSError, ValueError):
+            return [self.template_path]
+
+    def apply(self, changed, removed):
+        changed = sorted(os.path.normpath(path) for path in changed)
+        removed = sorted(os.path.normpath(path) for path in removed)
+        for path in changed + removed:
+            self.manifest.forget_input(path)
+
+        removed_outputs = []
+        for path in removed:
+            output = self.manifest.discard(path, self.dest_dir)
+            if output is not None:
+                print(f" - removed {output}")
+                removed_outputs.append(output)
+        outputs = list(removed_outputs)
+
+        template_changed = not set(changed).isdisjoint(self.template_inputs())
+        pages_changed = template_changed or any(
+            self.relative_to(path, self.content_dir) is not None for path in changed + removed
+        )
+        template = load_template(self.template_path, self.basepath)
+        rebuild_pages = template_changed or (pages_changed and "Pages" in template.names())
+        if rebuild_pages:
+            generate_pages_recursive(
+                self.content_dir, self.template_path, self.dest_dir, self.basepath, self.manifest, backend=self.backend
+            )
+        for path in changed:
+            relative = self.relative_to(path, self.content_dir)
+            if relative is not None and not rebuild_pages:
+                dest_path = Path(self.dest_dir, relative).with_suffix(".html")
+                title, summary = generate_page(path, self.template_path, dest_path, self.basepath, self.backend)
+                entry = index_entry(path, dest_path, self.dest_dir, title, summary)
+                self.manifest.record_page(path, self.template_path, dest_path, self.basepath, template.partials, entry)
+                outputs.append(dest_path)
+                continue
+            relative = self.relative_to(path, self.static_dir)
+            if relative is not None:
+                dest_path = os.path.join(self.dest_dir, relative)
+                print(f" * {path} -> {dest_path}")
+                active_output_writer().copy(path, dest_path)
+                self.manifest.record_static(path, dest_path)
+                outputs.append(dest_path)
+        if self.site_index_writer is not None and pages_changed:
+            outputs.extend(self.site_index_writer(self.site_index()))
+        self.manifest.save()
+        if self.compressor is not None:
+            if rebuild_pages:
+                self.compressor.run(self.dest_dir)
+            else:
+                self.compressor.refresh(outputs)
+            for output in removed_outputs:
+                remove_empty_dirs(os.path.dirname(output), self.dest_dir)
+        fragment_cache = active_fragment_cache()
+        if fragment_cache is not None:
+            fragment_cache.flush()
+        document_cache = active_document_cache()
+        if document_cache is not None:
+            document_cache.evict()
+
+    def site_index(self):
+        site_index = SiteIndex()
+        for entry in self.manifest.pages.values():
+            if "index" in entry:
+                site_index.add(entry["index"])
+        return site_index
+
+    def relative_to(self, path, dir_path):
+        if not path.startswith(dir_path + os.sep):
+            return None
+        return os.path.relpath(path, dir_path)
+
+
+class LiveReload:
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+    def wait(self, generation, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def __init__(self, *args, live_reload=None, **kwargs):
+        self.live_reload = live_reload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.send_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+        with open(path, "rb") as f:
+            body = f.read()
+        script = LIVE_RELOAD_SCRIPT.encode()
+        if b"</body>" in body:
+            body = body.replace(b"</body>", script + b"</body>", 1)
+        else:
+            body += script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.live_reload.generation
+        try:
+            while True:
+                latest = self.live_reload.wait(generation, KEEPALIVE_SECONDS)
+                if latest != generation:
+                    generation = latest
+                    self.wfile.write(f"event: reload\ndata: {generation}\n\n".encode())
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(dest_dir, port, live_reload):
+    handler = partial(LiveReloadHandler, directory=dest_dir, live_reload=live_reload)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def watch(rebuilder, port):
+    live_reload = LiveReload()
+    server = serve(rebuilder.dest_dir, port, live_reload)
+    watcher = ChangeWatcher(rebuilder.watched_paths())
+    print(f"Serving {rebuilder.dest_dir} at http://localhost:{port}/ and watching for changes...")
+    try:
+        while True:
+            changed, removed = watcher.wait_for_changes()
+            start = time.perf_counter()
+            try:
+                rebuilder.apply(changed, removed)
+            except Exception as e:
+                print(f"Rebuild failed: {e}")
+                continue
+            live_reload.notify()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Rebuilt {len(changed) + len(removed)} changed file(s) in {elapsed:.0f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()